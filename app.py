@@ -22,14 +22,29 @@ import streamlit as st
 from dotenv import load_dotenv
 import os
 
+# Biblioteka do logowania (diagnostyka generowania audio)
+import logging
+
+# Biblioteka do równoległego generowania audio
+import asyncio
+
 # Biblioteki do operacji na plikach
 from io import BytesIO
 from datetime import datetime
+import hashlib
+import tempfile
+import weakref
+import json
+from pathlib import Path
+from functools import partial
+from itertools import islice
+
+# Biblioteka do równoległego wykonywania zadań (dokument Word, zapis w bazie danych)
+from concurrent.futures import ThreadPoolExecutor
 
 # Importowanie modułów pomocniczych
+# (WordGenerator i AudioGenerator importowane dopiero tam, gdzie są potrzebne)
 from utils.openai_helper import OpenAIHelper
-from utils.word_generator import WordGenerator
-from utils.audio_generator import AudioGenerator
 from utils.database import DatabaseManager
 from utils.word_parser import WordParser
 
@@ -38,9 +53,14 @@ from config import (
     AVAILABLE_VOICES, 
     DEFAULT_VOICE,
     DEFAULT_AUDIO_SETTINGS,
-    GENERATION_PROMPT_TEMPLATE
+    GENERATION_PROMPT_TEMPLATE,
+    LOG_LEVEL
 )
 
+# Lista głosów i indeks domyślnego głosu (liczone raz, a nie przy każdym odświeżeniu)
+_VOICE_KEYS = list(AVAILABLE_VOICES.keys())
+_DEFAULT_VOICE_IDX = _VOICE_KEYS.index(DEFAULT_VOICE)
+
 # ============================================================
 # ŁADOWANIE KONFIGURACJI
 # ============================================================
@@ -48,6 +68,23 @@ from config import (
 # Ładowanie zmiennych środowiskowych z pliku .env
 load_dotenv()
 
+# Konfiguracja logowania - poziom z config.py lub zmiennej LOG_LEVEL tylko dla modułów
+# aplikacji (utils); biblioteki (httpx, openai) logują jedynie ostrzeżenia i błędy
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
+# Nieznana nazwa poziomu w LOG_LEVEL (setLevel rzuciłby ValueError) - poziom z config.py
+_log_level = os.getenv('LOG_LEVEL', LOG_LEVEL).upper()
+if _log_level not in logging.getLevelNamesMapping():
+    _log_level = LOG_LEVEL
+logging.getLogger('utils').setLevel(_log_level)
+
+# Logger aplikacji (ten sam poziom co moduły utils)
+log = logging.getLogger(__name__)
+log.setLevel(_log_level)
+
 # ============================================================
 # KONFIGURACJA STRONY STREAMLIT
 # ============================================================
@@ -72,9 +109,25 @@ if 'generated_words_text' not in st.session_state:
     # Tekst wygenerowanych słówek
     st.session_state.generated_words_text = None
 
-if 'generated_doc' not in st.session_state:
-    # Wygenerowany dokument Word
-    st.session_state.generated_doc = None
+if 'parsed_words' not in st.session_state:
+    # Sparsowane słówka (żeby nie parsować tekstu ponownie przy generowaniu audio)
+    st.session_state.parsed_words = None
+
+if 'generated_doc_path' not in st.session_state:
+    # Ścieżka do wygenerowanego dokumentu Word (plik tymczasowy)
+    st.session_state.generated_doc_path = None
+
+if 'batch_queue' not in st.session_state:
+    # Kolejka tematów do wysłania jako batch (OpenAI Batch API)
+    st.session_state.batch_queue = []
+
+if 'batches' not in st.session_state:
+    # Wysłane batche (wczytywane z bazy przy pierwszym użyciu)
+    st.session_state.batches = None
+
+if 'batch_results' not in st.session_state:
+    # Statusy i wyniki sprawdzonych batchy
+    st.session_state.batch_results = {}
 
 if 'openai_api_key' not in st.session_state:
     # Klucz API OpenAI (może być z .env lub wprowadzony ręcznie)
@@ -88,26 +141,450 @@ if 'vercel_token' not in st.session_state:
 # FUNKCJE POMOCNICZE
 # ============================================================
 
-def get_openai_helper():
+@st.cache_resource
+def get_openai_helper(api_key: str):
     """
     Zwraca instancję OpenAIHelper lub None jeśli brak klucza API
+    Instancja jest współdzielona między odświeżeniami (jeden klient HTTP na klucz)
     """
     # Sprawdzenie czy klucz API jest dostępny
-    api_key = st.session_state.openai_api_key
     if not api_key:
         return None
     return OpenAIHelper(api_key)
 
-def get_database_manager():
+@st.cache_resource
+def get_database_manager(token: str):
     """
     Zwraca instancję DatabaseManager lub None jeśli brak tokenu
+    Instancja jest współdzielona między odświeżeniami (jedna na token)
     """
     # Sprawdzenie czy token Vercel jest dostępny
-    token = st.session_state.vercel_token
     if not token:
         return None
     return DatabaseManager(token)
 
+@st.cache_resource
+def get_parser():
+    """
+    Zwraca współdzieloną instancję WordParser
+    """
+    return WordParser()
+
+@st.cache_resource
+def get_word_generator():
+    """
+    Zwraca współdzieloną instancję WordGenerator
+    """
+    from utils.word_generator import WordGenerator
+    return WordGenerator()
+
+# Dane z Vercel Blob są cache'owane per token (a nie per obiekt managera)
+_DB_HASH_FUNCS = {DatabaseManager: lambda db: db.token}
+
+@st.cache_data(ttl=60, hash_funcs=_DB_HASH_FUNCS)
+def _cached_words_history(db):
+    """
+    Zwraca historię słówek z cache (odświeżana co 60 s lub po zapisie)
+    """
+    return db.get_words_history()
+
+@st.cache_data(ttl=60, hash_funcs=_DB_HASH_FUNCS)
+def _cached_list_files(db):
+    """
+    Zwraca listę plików z cache (odświeżana co 60 s lub po zmianie)
+    """
+    return db.list_files()
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False, hash_funcs=_DB_HASH_FUNCS)
+def _cached_download(db, url: str) -> bytes:
+    """
+    Pobiera pojedynczy plik z Vercel Blob (cache per URL - podgląd i pobieranie nie pobierają go ponownie)
+    Czyszczony razem z listą plików - zapis pod tą samą nazwą zmienia zawartość pod tym samym URL
+    """
+    return db.download_file(url).getvalue()
+
+# Liczba słówek z historii wyświetlanych na jednej stronie
+HISTORY_PAGE_SIZE = 200
+
+@st.cache_data(show_spinner=False)
+def _sorted_history(words: tuple) -> list:
+    """
+    Zwraca posortowaną historię słówek (sortowanie raz dla danej historii)
+    """
+    return sorted(words)
+
+@st.cache_data(show_spinner=False)
+def _parse_docx_bytes(data: bytes):
+    """
+    Parsuje dokument Word (cache po zawartości pliku - ten sam plik nie jest parsowany ponownie)
+    """
+    return get_parser().parse_document(BytesIO(data))
+
+def _today_str() -> str:
+    """
+    Zwraca dzisiejszą datę w formacie rr.mm.dd (do nazw plików)
+    """
+    return datetime.now().strftime("%y.%m.%d")
+
+class _SessionFile(str):
+    """
+    Ścieżka pliku tymczasowego sesji (plik usuwany, gdy ścieżka przestaje być używana:
+    po zapisaniu nowego pliku, po zakończeniu sesji lub zamknięciu aplikacji)
+    """
+
+def _remove_file(path: str):
+    """
+    Usuwa plik tymczasowy (jeśli jeszcze istnieje)
+    """
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _store_file(state_key: str, data: bytes, suffix: str):
+    """
+    Zapisuje dane do pliku tymczasowego i zapamiętuje w sesji tylko jego ścieżkę
+    (duże pliki MP3 / Word nie są przechowywane w st.session_state)
+    
+    Args:
+        state_key: Klucz w sesji, pod którym zapisywana jest ścieżka
+        data: Zawartość pliku
+        suffix: Rozszerzenie pliku (np. ".mp3")
+    """
+    # Poprzedni plik tego samego klucza (do usunięcia)
+    _drop_file(state_key)
+    
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+        f.write(data)
+    
+    # Plik usuwany razem ze ścieżką - sesja zakończona bez _drop_file nie zostawia plików
+    path = _SessionFile(f.name)
+    weakref.finalize(path, _remove_file, f.name)
+    st.session_state[state_key] = path
+
+def _drop_file(state_key: str):
+    """
+    Usuwa plik tymczasowy zapisany przez _store_file i czyści ścieżkę w sesji
+    """
+    path = st.session_state.get(state_key)
+    if path:
+        _remove_file(path)
+    st.session_state[state_key] = None
+
+def build_generation_prompt(topic: str, word_count: int, existing_words: list) -> str:
+    """
+    Tworzy prompt do generowania listy słówek
+    
+    Args:
+        topic: Temat słówek
+        word_count: Liczba słówek do wygenerowania
+        existing_words: Lista słówek z historii (do unikania powtórzeń)
+        
+    Returns:
+        Gotowy prompt dla modelu
+    """
+    # Formatowanie listy istniejących słówek
+    if existing_words:
+        existing_words_text = ", ".join(islice(existing_words, 100))  # Max 100 słówek w prompt (bez kopiowania listy)
+        extra = len(existing_words) - 100
+        if extra > 0:
+            existing_words_text += f" ... (i {extra} więcej)"
+    else:
+        existing_words_text = "Brak wcześniejszych słówek"
+    
+    return GENERATION_PROMPT_TEMPLATE.format(
+        count=word_count,
+        topic=topic,
+        existing_words=existing_words_text
+    )
+
+def save_generated_words(generated_text: str, topic: str, db_manager, file_suffix: str = None):
+    """
+    Przetwarza odpowiedź modelu: zapisuje słówka w sesji i historii,
+    tworzy dokument Word i zapisuje go w chmurze
+    
+    Args:
+        generated_text: Odpowiedź modelu (JSON z listą słówek)
+        topic: Temat słówek
+        db_manager: Manager bazy danych (lub None)
+        file_suffix: Dopisek do nazwy dokumentu w chmurze (None - nazwa z samą datą)
+        
+    Returns:
+        Lista słówek lub None, jeśli odpowiedzi nie udało się odczytać
+    """
+    # Odczytanie słówek z odpowiedzi JSON (bez parsowania tekstu)
+    # Odmowa modelu daje odpowiedź bez treści (None) - TypeError, ten sam komunikat
+    # Pola słówek w jednej linii (nowe linie z JSON rozbiłyby format tekstowy)
+    parser = get_parser()
+    try:
+        words = parser.clean_words(json.loads(generated_text)['words'])
+    except (ValueError, KeyError, TypeError) as e:
+        st.error(f"❌ Nie udało się odczytać odpowiedzi modelu: {e}")
+        return None
+    
+    # Lista słówek do historii prosto z pól "english" odpowiedzi JSON
+    word_list = parser.extract_word_list(words)
+    
+    # Tekst listy słówek (do wyświetlenia i do dokumentu Word)
+    generated_text = parser.format_words_as_text(words)
+    
+    # Zapisanie wygenerowanego tekstu i słówek w sesji
+    st.session_state.generated_words_text = generated_text
+    st.session_state.parsed_words = words
+    
+    # Zapis historii, tworzenie dokumentu Word i jego upload działają równolegle
+    # (wywołania Streamlit tylko w głównym wątku)
+    word_generator = get_word_generator()
+    with st.spinner("📄 Tworzę dokument Word i zapisuję do bazy danych..."):
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Zapisywanie historii słówek do bazy danych
+            history_future = None
+            if db_manager and word_list:
+                history_future = executor.submit(db_manager.add_words_to_history, word_list)
+            
+            # Generowanie dokumentu Word (w trakcie zapisu historii)
+            doc_buffer = executor.submit(word_generator.create_document, generated_text, topic).result()
+            
+            # Zapisywanie dokumentu do Vercel Blob
+            upload_future = None
+            if db_manager:
+                upload_future = executor.submit(db_manager.save_word_document, doc_buffer, topic, file_suffix)
+            
+            # Zapis dokumentu do pliku tymczasowego (w trakcie uploadu)
+            _store_file('generated_doc_path', doc_buffer.getvalue(), ".docx")
+            
+            if history_future:
+                history_future.result()
+                _cached_words_history.clear()
+            
+            if upload_future:
+                try:
+                    upload_future.result()
+                    # Plik z tą samą nazwą (ten sam dzień) mógł zostać nadpisany
+                    _cached_list_files.clear()
+                    _cached_download.clear()
+                except Exception as e:
+                    st.warning(f"⚠️ Nie udało się zapisać w chmurze: {e}")
+    
+    return words
+
+def render_batch_section(openai_helper, db_manager, topic: str, word_count: int):
+    """
+    Sekcja generowania wielu list słówek naraz przez OpenAI Batch API
+    (taniej niż zwykłe zapytania, ale wynik może przyjść nawet po 24h)
+    
+    Args:
+        openai_helper: Helper OpenAI
+        db_manager: Manager bazy danych (lub None)
+        topic: Temat wpisany w formularzu generowania
+        word_count: Liczba słówek wpisana w formularzu generowania
+    """
+    with st.expander("📦 Generowanie wsadowe (Batch API - taniej, wynik do 24h)"):
+        # Dodanie aktualnego tematu do kolejki
+        if st.button("➕ Dodaj temat do kolejki"):
+            if not topic:
+                st.error("❌ Wprowadź temat słówek")
+            else:
+                st.session_state.batch_queue.append({'topic': topic, 'count': int(word_count)})
+        
+        # Kolejka tematów czekających na wysłanie
+        queue = st.session_state.batch_queue
+        if queue:
+            st.write("**Kolejka tematów:**")
+            for item in queue:
+                st.write(f"• {item['topic']} ({item['count']} słówek)")
+            
+            if st.button("📤 Wyślij batch"):
+                # Historia słówek (wspólna dla wszystkich tematów w batchu)
+                existing_words = _cached_words_history(db_manager) if db_manager else []
+                prompts = [
+                    build_generation_prompt(item['topic'], item['count'], existing_words)
+                    for item in queue
+                ]
+                
+                with st.spinner("📤 Wysyłam batch..."):
+                    try:
+                        batch_id = openai_helper.create_words_batch(prompts)
+                    except Exception as e:
+                        st.error(f"❌ Nie udało się wysłać batcha: {e}")
+                        batch_id = None
+                
+                if batch_id:
+                    # Lista batchy z bazy potrzebna przed zapisem (aby nie nadpisać wcześniejszych)
+                    if st.session_state.batches is None:
+                        st.session_state.batches = db_manager.get_batches() if db_manager else []
+                    
+                    # Zapisanie batcha (ID + tematy w kolejności promptów)
+                    st.session_state.batches.append({
+                        'id': batch_id,
+                        'items': list(queue),
+                        'created': datetime.now().isoformat()
+                    })
+                    if db_manager and not db_manager.save_batches(st.session_state.batches):
+                        st.warning("⚠️ Nie udało się zapisać listy batchy w chmurze - batch będzie widoczny tylko w tej sesji")
+                    st.session_state.batch_queue = []
+                    st.success(f"✅ Wysłano batch {batch_id}")
+        
+        # Wysłane batche wczytujemy z bazy dopiero po kliknięciu, raz na sesję
+        # (bez zapytania do bazy przy pierwszym wyświetleniu strony)
+        if st.session_state.batches is None:
+            if not st.button("📂 Pokaż wysłane batche"):
+                return
+            with st.spinner("📂 Wczytuję wysłane batche..."):
+                st.session_state.batches = db_manager.get_batches() if db_manager else []
+        
+        # Wysłane batche - sprawdzanie statusu i wczytywanie wyników
+        for batch in list(st.session_state.batches):
+            batch_id = batch['id']
+            topics = ", ".join(item['topic'] for item in batch['items'])
+            st.write(f"**{batch_id}** – {topics}")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("🔄 Sprawdź status", key=f"batch_status_{batch_id}"):
+                    with st.spinner("🔄 Sprawdzam status..."):
+                        try:
+                            st.session_state.batch_results[batch_id] = openai_helper.get_words_batch(batch_id)
+                        except Exception as e:
+                            st.error(f"❌ Nie udało się sprawdzić statusu: {e}")
+            with col2:
+                if st.button("🗑️ Usuń z listy", key=f"batch_remove_{batch_id}"):
+                    st.session_state.batches.remove(batch)
+                    st.session_state.batch_results.pop(batch_id, None)
+                    if db_manager and not db_manager.save_batches(st.session_state.batches):
+                        # Bez odświeżenia strony - komunikat pozostaje widoczny
+                        st.warning("⚠️ Nie udało się zapisać listy batchy w chmurze - usunięty batch wróci w nowej sesji")
+                    else:
+                        st.rerun()
+            
+            # Wyniki (custom_id w batchu = indeks tematu)
+            if batch_id in st.session_state.batch_results:
+                status, results, errors = st.session_state.batch_results[batch_id]
+                st.caption(f"Status: {status}")
+                if errors:
+                    st.warning(f"⚠️ Nieudane zapytania w batchu: {len(errors)}")
+                for i, item in enumerate(batch['items']):
+                    # Błąd zapytania dla danego tematu
+                    if str(i) in errors:
+                        st.error(f"❌ {item['topic']}: {errors[str(i)]}")
+                        continue
+                    content = results.get(str(i))
+                    if content and st.button(f"📥 Wczytaj: {item['topic']}", key=f"batch_load_{batch_id}_{i}"):
+                        # Osobny plik dla każdego tematu z batcha (numer - ten sam temat
+                        # może być w kolejce kilka razy)
+                        words = save_generated_words(
+                            content, item['topic'], db_manager,
+                            file_suffix=f"{item['topic']} ({i + 1})"
+                        )
+                        if words is not None:
+                            st.success(f"✅ Wczytano {len(words)} słówek!")
+
+def render_audio_settings(prefix: str, submit_label: str):
+    """
+    Wyświetla formularz ustawień audio (wspólny dla zakładek generowania i konwersji)
+    Widżety w formularzu nie odświeżają strony - odświeżenie następuje raz, po kliknięciu przycisku
+    
+    Args:
+        prefix: Prefiks kluczy widżetów (unikalny dla zakładki)
+        submit_label: Tekst przycisku generowania
+        
+    Returns:
+        Słownik z ustawieniami audio po kliknięciu przycisku, w przeciwnym razie None
+    """
+    with st.form(f"{prefix}_audio_settings"):
+        # Ustawienia audio w kolumnach
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            # Szybkość mowy
+            speed = st.slider(
+                "Szybkość mowy:",
+                min_value=0.5,
+                max_value=2.0,
+                value=DEFAULT_AUDIO_SETTINGS['speed'],
+                step=0.1,
+                help="0.5 = wolno, 1.0 = normalnie, 2.0 = szybko",
+                key=f"{prefix}_speed"
+            )
+            
+            # Głos lektora
+            voice = st.selectbox(
+                "Głos lektora:",
+                options=_VOICE_KEYS,
+                format_func=lambda x: AVAILABLE_VOICES[x],
+                index=_DEFAULT_VOICE_IDX,
+                key=f"{prefix}_voice"
+            )
+        
+        with col2:
+            # Przerwa między hasłami
+            pause_between = st.slider(
+                "Przerwa między hasłami (s):",
+                min_value=0.5,
+                max_value=5.0,
+                value=DEFAULT_AUDIO_SETTINGS['pause_between'],
+                step=0.5,
+                help="Czas przerwy między kolejnymi słówkami",
+                key=f"{prefix}_pause"
+            )
+            
+            # Liczba powtórzeń
+            repetitions = st.selectbox(
+                "Liczba powtórzeń hasła:",
+                options=[1, 2],
+                index=0,
+                help="Ile razy powtórzyć każde słówko",
+                key=f"{prefix}_repetitions"
+            )
+        
+        with col3:
+            # Czy czytać przykłady
+            include_examples = st.checkbox(
+                "Czytaj przykładowe zdania",
+                value=DEFAULT_AUDIO_SETTINGS['include_examples'],
+                help="Czy lektor ma czytać zdania przykładowe",
+                key=f"{prefix}_examples"
+            )
+            
+            # Tryb testu
+            test_mode = st.selectbox(
+                "Tryb nauki:",
+                options=[
+                    ("Normalny (angielski → polski)", None),
+                    ("Test: polski → angielski", "pl_to_en"),
+                    ("Test: angielski → polski", "en_to_pl")
+                ],
+                format_func=lambda x: x[0],
+                help="Wybierz tryb nauki",
+                key=f"{prefix}_test_mode"
+            )[1]  # Pobieramy drugą wartość krotki (tryb)
+            
+            # Jedno zapytanie TTS na hasło (szybciej, ale przerwy wyznacza lektor)
+            merge_utterances = st.checkbox(
+                "Szybkie generowanie (jedno nagranie na hasło)",
+                value=DEFAULT_AUDIO_SETTINGS['merge_utterances'],
+                help="Hasło, tłumaczenie i przykład czytane w jednym nagraniu - "
+                     "mniej zapytań do API, przerwy wynikają z interpunkcji. "
+                     "Tryby testu zawsze używają osobnych nagrań.",
+                key=f"{prefix}_merge"
+            )
+        
+        # Przycisk do generowania audio
+        submitted = st.form_submit_button(submit_label, type="primary")
+    
+    if not submitted:
+        return None
+    
+    return {
+        'speed': speed,
+        'pause_between': pause_between,
+        'repetitions': repetitions,
+        'include_examples': include_examples,
+        'test_mode': test_mode,
+        'voice': voice,
+        'merge_utterances': merge_utterances
+    }
+
 def display_chat_message(role: str, content: str):
     """
     Wyświetla wiadomość w stylu czatu
@@ -179,9 +656,8 @@ def tab_generate_words():
         return
     
     # Inicjalizacja helperów
-    openai_helper = get_openai_helper()
-    db_manager = get_database_manager()
-    word_generator = WordGenerator()
+    openai_helper = get_openai_helper(st.session_state.openai_api_key)
+    db_manager = get_database_manager(st.session_state.vercel_token)
     
     # --------------------------------------------------------
     # SEKCJA: GENEROWANIE LISTY SŁÓWEK
@@ -218,54 +694,24 @@ def tab_generate_words():
             existing_words = []
             if db_manager:
                 with st.spinner("📚 Pobieranie historii słówek..."):
-                    existing_words = db_manager.get_words_history()
-            
-            # Formatowanie listy istniejących słówek
-            if existing_words:
-                existing_words_text = ", ".join(existing_words[:100])  # Max 100 słówek w prompt
-                if len(existing_words) > 100:
-                    existing_words_text += f" ... (i {len(existing_words) - 100} więcej)"
-            else:
-                existing_words_text = "Brak wcześniejszych słówek"
+                    existing_words = _cached_words_history(db_manager)
             
             # Tworzenie promptu do generowania
-            generation_prompt = GENERATION_PROMPT_TEMPLATE.format(
-                count=word_count,
-                topic=topic,
-                existing_words=existing_words_text
-            )
+            generation_prompt = build_generation_prompt(topic, word_count, existing_words)
             
             # Generowanie słówek
             with st.spinner("✨ Generuję słówka..."):
                 generated_text = openai_helper.generate_words(generation_prompt)
             
-            # Zapisanie wygenerowanego tekstu w sesji
-            st.session_state.generated_words_text = generated_text
-            
-            # Parsowanie słówek
-            parser = WordParser()
-            words = parser.parse_text(generated_text)
-            word_list = parser.extract_word_list(words)
-            
-            # Zapisywanie do bazy danych
-            if db_manager and word_list:
-                with st.spinner("💾 Zapisuję do bazy danych..."):
-                    db_manager.add_words_to_history(word_list)
-            
-            # Generowanie dokumentu Word
-            with st.spinner("📄 Tworzę dokument Word..."):
-                doc_buffer = word_generator.create_document(generated_text, topic)
-                st.session_state.generated_doc = doc_buffer
-            
-            # Zapisywanie dokumentu do Vercel Blob
-            if db_manager:
-                with st.spinner("☁️ Zapisuję dokument w chmurze..."):
-                    try:
-                        db_manager.save_word_document(doc_buffer, topic)
-                    except Exception as e:
-                        st.warning(f"⚠️ Nie udało się zapisać w chmurze: {e}")
-            
-            st.success(f"✅ Wygenerowano {len(words)} słówek!")
+            # Zapisanie słówek (sesja, historia, dokument Word, chmura)
+            words = save_generated_words(generated_text, topic, db_manager)
+            if words is not None:
+                st.success(f"✅ Wygenerowano {len(words)} słówek!")
+    
+    # --------------------------------------------------------
+    # SEKCJA: GENEROWANIE WSADOWE (OPENAI BATCH API)
+    # --------------------------------------------------------
+    render_batch_section(openai_helper, db_manager, topic, word_count)
     
     # --------------------------------------------------------
     # SEKCJA: PODGLĄD I POBIERANIE WYGENEROWANYCH SŁÓWEK
@@ -279,17 +725,15 @@ def tab_generate_words():
             st.markdown(st.session_state.generated_words_text)
         
         # Przycisk do pobrania dokumentu Word
-        if st.session_state.generated_doc:
-            # Reset pozycji bufora
-            st.session_state.generated_doc.seek(0)
-            
+        if st.session_state.generated_doc_path:
             # Generowanie nazwy pliku według schematu: Słówka rr.mm.dd
-            date_str = datetime.now().strftime("%y.%m.%d")
+            date_str = _today_str()
             filename = f"Słówka {date_str}.docx"
             
             st.download_button(
                 label="📥 Pobierz plik Word",
-                data=st.session_state.generated_doc,
+                # Plik czytany z dysku dopiero po kliknięciu
+                data=Path(st.session_state.generated_doc_path).read_bytes,
                 file_name=filename,
                 mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
             )
@@ -300,127 +744,60 @@ def tab_generate_words():
         st.divider()
         st.subheader("🎧 Konwersja na audio")
         
-        # Ustawienia audio w kolumnach
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Szybkość mowy
-            speed = st.slider(
-                "Szybkość mowy:",
-                min_value=0.5,
-                max_value=2.0,
-                value=DEFAULT_AUDIO_SETTINGS['speed'],
-                step=0.1,
-                help="0.5 = wolno, 1.0 = normalnie, 2.0 = szybko"
-            )
-            
-            # Głos lektora
-            voice = st.selectbox(
-                "Głos lektora:",
-                options=list(AVAILABLE_VOICES.keys()),
-                format_func=lambda x: AVAILABLE_VOICES[x],
-                index=list(AVAILABLE_VOICES.keys()).index(DEFAULT_VOICE)
-            )
-        
-        with col2:
-            # Przerwa między hasłami
-            pause_between = st.slider(
-                "Przerwa między hasłami (s):",
-                min_value=0.5,
-                max_value=5.0,
-                value=DEFAULT_AUDIO_SETTINGS['pause_between'],
-                step=0.5,
-                help="Czas przerwy między kolejnymi słówkami"
-            )
-            
-            # Liczba powtórzeń
-            repetitions = st.selectbox(
-                "Liczba powtórzeń hasła:",
-                options=[1, 2],
-                index=0,
-                help="Ile razy powtórzyć każde słówko"
-            )
-        
-        with col3:
-            # Czy czytać przykłady
-            include_examples = st.checkbox(
-                "Czytaj przykładowe zdania",
-                value=DEFAULT_AUDIO_SETTINGS['include_examples'],
-                help="Czy lektor ma czytać zdania przykładowe"
-            )
-            
-            # Tryb testu
-            test_mode = st.selectbox(
-                "Tryb nauki:",
-                options=[
-                    ("Normalny (angielski → polski)", None),
-                    ("Test: polski → angielski", "pl_to_en"),
-                    ("Test: angielski → polski", "en_to_pl")
-                ],
-                format_func=lambda x: x[0],
-                help="Wybierz tryb nauki"
-            )[1]  # Pobieramy drugą wartość krotki (tryb)
+        # Ustawienia audio (formularz - odświeżenie dopiero po kliknięciu przycisku)
+        audio_settings = render_audio_settings("generate", "🎤 Generuj plik audio")
         
-        # Przycisk do generowania audio
-        if st.button("🎤 Generuj plik audio", type="primary"):
-            # Parsowanie słówek
-            parser = WordParser()
-            words = parser.parse_text(st.session_state.generated_words_text)
+        if audio_settings:
+            # Słówka sparsowane podczas generowania (parsowanie tylko gdy ich brak)
+            words = (st.session_state.parsed_words
+                     or get_parser().parse_text(st.session_state.generated_words_text))
             
             if not words:
                 st.error("❌ Nie znaleziono słówek do konwersji")
             else:
-                # Ustawienia audio
-                audio_settings = {
-                    'speed': speed,
-                    'pause_between': pause_between,
-                    'repetitions': repetitions,
-                    'include_examples': include_examples,
-                    'test_mode': test_mode,
-                    'voice': voice
-                }
-                
                 # Generowanie audio
                 with st.spinner("🎵 Generuję audio... Proszę czekać."):
                     try:
+                        from utils.audio_generator import AudioGenerator
                         audio_generator = AudioGenerator(openai_helper)
-                        audio_buffer = audio_generator.generate_audio(words, audio_settings)
+                        audio_buffer = asyncio.run(
+                            audio_generator.generate_audio_async(words, audio_settings)
+                        )
                         
                         # Pobranie danych audio
                         audio_data = audio_buffer.getvalue()
                         
                         # Debug - sprawdzenie rozmiaru
-                        print(f"\n[APP] Rozmiar audio: {len(audio_data)} bajtów")
+                        log.debug("[APP] Rozmiar audio: %d bajtów", len(audio_data))
                         
                         if len(audio_data) == 0:
                             st.error("❌ Wygenerowane audio ma 0 bajtów - sprawdź logi terminala")
                         else:
-                            # Zapisanie audio w sesji do odtwarzania
-                            st.session_state.generated_audio = audio_data
+                            # Zapisanie audio do pliku (w sesji tylko ścieżka)
+                            _store_file('generated_audio_path', audio_data, ".mp3")
                             
                             st.success(f"✅ Audio zostało wygenerowane! ({len(audio_data)} bajtów)")
-                            st.rerun()  # Odświeżenie strony aby pokazać odtwarzacz
                         
                     except Exception as e:
                         st.error(f"❌ Błąd generowania audio: {e}")
-                        import traceback
-                        print(f"\n[APP ERROR] {traceback.format_exc()}")
+                        log.exception("[APP] Błąd generowania audio")
         
         # Wyświetlenie odtwarzacza i przycisku pobierania jeśli audio zostało wygenerowane
-        if 'generated_audio' in st.session_state and st.session_state.generated_audio:
+        if st.session_state.get('generated_audio_path'):
             st.divider()
             st.subheader("🎧 Wygenerowane audio")
             
             # Odtwarzacz audio
-            st.audio(st.session_state.generated_audio, format="audio/mp3")
+            st.audio(st.session_state.generated_audio_path, format="audio/mp3")
             
             # Przycisk do pobrania pliku
-            date_str = datetime.now().strftime("%y.%m.%d")
+            date_str = _today_str()
             audio_filename = f"Słówka {date_str}.mp3"
             
             st.download_button(
                 label="📥 Pobierz plik MP3",
-                data=st.session_state.generated_audio,
+                # Plik czytany z dysku dopiero po kliknięciu
+                data=Path(st.session_state.generated_audio_path).read_bytes,
                 file_name=audio_filename,
                 mime="audio/mpeg"
             )
@@ -431,7 +808,8 @@ def tab_generate_words():
         if st.button("🗑️ Wyczyść konwersację"):
             st.session_state.conversation_history = []
             st.session_state.generated_words_text = None
-            st.session_state.generated_doc = None
+            _drop_file('generated_doc_path')
+            st.session_state.parsed_words = None
             st.rerun()
 
 # ============================================================
@@ -449,8 +827,8 @@ def tab_convert_file():
         return
     
     # Inicjalizacja helperów
-    openai_helper = get_openai_helper()
-    db_manager = get_database_manager()
+    openai_helper = get_openai_helper(st.session_state.openai_api_key)
+    db_manager = get_database_manager(st.session_state.vercel_token)
     
     # --------------------------------------------------------
     # SEKCJA: UPLOAD PLIKU
@@ -465,27 +843,30 @@ def tab_convert_file():
     )
     
     if uploaded_file:
-        # Odczytanie pliku
-        file_data = BytesIO(uploaded_file.read())
+        # Odczytanie pliku (bajty - klucz cache parsowania)
+        data = uploaded_file.getvalue()
         
         # Parsowanie dokumentu
-        parser = WordParser()
+        parser = get_parser()
         
         try:
-            words = parser.parse_document(file_data)
+            words = _parse_docx_bytes(data)
             
             if not words:
                 st.error("❌ Nie znaleziono słówek w pliku. Sprawdź format.")
             else:
                 st.success(f"✅ Znaleziono {len(words)} słówek")
                 
-                # Zapisywanie do historii słówek
-                if db_manager:
+                # Zapisywanie do historii słówek (raz na wgrany plik, nie przy każdym odświeżeniu)
+                file_hash = hashlib.sha256(data).hexdigest()
+                if db_manager and st.session_state.get('history_saved_file') != file_hash:
                     word_list = parser.extract_word_list(words)
                     if word_list:
                         with st.spinner("💾 Zapisuję do historii..."):
                             try:
                                 db_manager.add_words_to_history(word_list)
+                                _cached_words_history.clear()
+                                st.session_state.history_saved_file = file_hash
                                 st.info("📝 Słówka zostały dodane do historii")
                             except Exception as e:
                                 st.warning(f"⚠️ Nie udało się zapisać do historii: {e}")
@@ -501,101 +882,41 @@ def tab_convert_file():
                 st.divider()
                 st.subheader("🎧 Ustawienia konwersji audio")
                 
-                # Ustawienia w kolumnach
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    speed = st.slider(
-                        "Szybkość mowy:",
-                        min_value=0.5,
-                        max_value=2.0,
-                        value=1.0,
-                        step=0.1,
-                        key="convert_speed"
-                    )
-                    
-                    voice = st.selectbox(
-                        "Głos lektora:",
-                        options=list(AVAILABLE_VOICES.keys()),
-                        format_func=lambda x: AVAILABLE_VOICES[x],
-                        index=list(AVAILABLE_VOICES.keys()).index(DEFAULT_VOICE),
-                        key="convert_voice"
-                    )
-                
-                with col2:
-                    pause_between = st.slider(
-                        "Przerwa między hasłami (s):",
-                        min_value=0.5,
-                        max_value=5.0,
-                        value=2.0,
-                        step=0.5,
-                        key="convert_pause"
-                    )
-                    
-                    repetitions = st.selectbox(
-                        "Liczba powtórzeń:",
-                        options=[1, 2],
-                        index=0,
-                        key="convert_repetitions"
-                    )
-                
-                with col3:
-                    include_examples = st.checkbox(
-                        "Czytaj przykłady",
-                        value=True,
-                        key="convert_examples"
-                    )
-                    
-                    test_mode = st.selectbox(
-                        "Tryb nauki:",
-                        options=[
-                            ("Normalny", None),
-                            ("Test: PL → EN", "pl_to_en"),
-                            ("Test: EN → PL", "en_to_pl")
-                        ],
-                        format_func=lambda x: x[0],
-                        key="convert_test_mode"
-                    )[1]
+                # Ustawienia audio (formularz - odświeżenie dopiero po kliknięciu przycisku)
+                audio_settings = render_audio_settings("convert", "🎤 Konwertuj na audio")
                 
-                # Przycisk do generowania
-                if st.button("🎤 Konwertuj na audio", type="primary", key="convert_btn"):
-                    audio_settings = {
-                        'speed': speed,
-                        'pause_between': pause_between,
-                        'repetitions': repetitions,
-                        'include_examples': include_examples,
-                        'test_mode': test_mode,
-                        'voice': voice
-                    }
-                    
+                if audio_settings:
                     with st.spinner("🎵 Generuję audio... Proszę czekać."):
                         try:
+                            from utils.audio_generator import AudioGenerator
                             audio_generator = AudioGenerator(openai_helper)
-                            audio_buffer = audio_generator.generate_audio(words, audio_settings)
+                            audio_buffer = asyncio.run(
+                                audio_generator.generate_audio_async(words, audio_settings)
+                            )
                             
-                            # Zapisanie audio w sesji
-                            st.session_state.converted_audio = audio_buffer.getvalue()
+                            # Zapisanie audio do pliku (w sesji tylko ścieżka)
+                            _store_file('converted_audio_path', audio_buffer.getvalue(), ".mp3")
                             st.success("✅ Audio zostało wygenerowane!")
-                            st.rerun()
                             
                         except Exception as e:
                             st.error(f"❌ Błąd: {e}")
                 
                 # Wyświetlenie odtwarzacza jeśli audio zostało wygenerowane
-                if 'converted_audio' in st.session_state and st.session_state.converted_audio:
+                if st.session_state.get('converted_audio_path'):
                     st.divider()
                     st.subheader("🎧 Wygenerowane audio")
                     
                     # Odtwarzacz audio
-                    st.audio(st.session_state.converted_audio, format="audio/mp3")
+                    st.audio(st.session_state.converted_audio_path, format="audio/mp3")
                     
                     # Nazwa pliku według schematu: Słówka rr.mm.dd
-                    date_str = datetime.now().strftime("%y.%m.%d")
+                    date_str = _today_str()
                     audio_filename = f"Słówka {date_str}.mp3"
                     
                     st.download_button(
                         label="📥 Pobierz plik MP3",
-                        data=st.session_state.converted_audio,
+                        # Plik czytany z dysku dopiero po kliknięciu
+                        data=Path(st.session_state.converted_audio_path).read_bytes,
                         file_name=audio_filename,
                         mime="audio/mpeg"
                     )
@@ -614,7 +935,7 @@ def tab_manage_files():
     st.header("📁 Zarządzanie plikami")
     
     # Inicjalizacja managera bazy danych
-    db_manager = get_database_manager()
+    db_manager = get_database_manager(st.session_state.vercel_token)
     
     if not db_manager:
         st.warning("⚠️ Nie skonfigurowano połączenia z Vercel Blob")
@@ -624,7 +945,7 @@ def tab_manage_files():
     # Pobieranie listy plików
     with st.spinner("📂 Pobieranie listy plików..."):
         try:
-            files = db_manager.list_files()
+            files = _cached_list_files(db_manager)
         except Exception as e:
             st.error(f"❌ Błąd pobierania plików: {e}")
             return
@@ -660,12 +981,11 @@ def tab_manage_files():
                 file_url = file.get('url', '')
                 if file_url:
                     try:
-                        # Pobieranie pliku
-                        file_data = db_manager.download_file(file_url)
-                        
                         st.download_button(
                             label="📥 Pobierz",
-                            data=file_data,
+                            # Zawartość pliku pobierana dopiero po kliknięciu
+                            # (bez pobierania wszystkich plików przy każdym odświeżeniu)
+                            data=partial(_cached_download, db_manager, file_url),
                             file_name=file.get('pathname', 'plik.docx'),
                             mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
                             key=f"download_{file.get('pathname')}"
@@ -676,6 +996,8 @@ def tab_manage_files():
                 # Przycisk do usunięcia
                 if st.button("🗑️ Usuń", key=f"delete_{file.get('pathname')}"):
                     if db_manager.delete_file(file_url):
+                        _cached_list_files.clear()
+                        _cached_download.clear()
                         st.success("✅ Plik usunięty")
                         st.rerun()
                     else:
@@ -685,9 +1007,9 @@ def tab_manage_files():
             if file_url:
                 if st.button("👁️ Podgląd zawartości", key=f"preview_{file.get('pathname')}"):
                     try:
-                        file_data = db_manager.download_file(file_url)
-                        parser = WordParser()
-                        words = parser.parse_document(file_data)
+                        file_bytes = _cached_download(db_manager, file_url)
+                        parser = get_parser()
+                        words = _parse_docx_bytes(file_bytes)
                         
                         if words:
                             formatted = parser.format_words_for_display(words)
@@ -704,7 +1026,7 @@ def tab_manage_files():
     st.subheader("📊 Statystyki")
     
     # Pobieranie historii słówek
-    words_history = db_manager.get_words_history()
+    words_history = _cached_words_history(db_manager)
     
     col1, col2 = st.columns(2)
     
@@ -717,9 +1039,16 @@ def tab_manage_files():
     # Lista wszystkich słówek
     if words_history:
         with st.expander("📝 Zobacz wszystkie słówka w historii"):
+            sorted_words = _sorted_history(tuple(words_history))
+            
+            # Podział na strony (renderujemy max HISTORY_PAGE_SIZE słówek naraz)
+            max_page = max(1, -(-len(sorted_words) // HISTORY_PAGE_SIZE))
+            page = st.number_input("Strona", min_value=1, max_value=max_page, value=1, key="history_page")
+            page_words = sorted_words[(page - 1) * HISTORY_PAGE_SIZE:page * HISTORY_PAGE_SIZE]
+            
             # Wyświetlenie słówek w kolumnach
             cols = st.columns(4)
-            for i, word in enumerate(sorted(words_history)):
+            for i, word in enumerate(page_words):
                 cols[i % 4].write(f"• {word}")
 
 # ============================================================
@@ -36,12 +36,32 @@ DEFAULT_AUDIO_SETTINGS = {
     "pause_between": 2.0,   # Przerwa między hasłami (sekundy)
     "repetitions": 1,       # Ile razy powtórzyć hasło (1 lub 2)
     "include_examples": True,  # Czy czytać przykładowe zdania
-    "test_mode": None       # None / "pl_to_en" / "en_to_pl"
+    "test_mode": None,      # None / "pl_to_en" / "en_to_pl"
+    "merge_utterances": False  # Jedno zapytanie TTS na hasło (pauzy z interpunkcji)
 }
 
 # Przerwa w trybie testowym (sekundy) - czas na odpowiedź użytkownika
 TEST_PAUSE_DURATION = 2.0
 
+# Maksymalna liczba równoległych zapytań TTS (można nadpisać zmienną TTS_CONCURRENCY)
+TTS_CONCURRENCY = 8
+
+# Liczba prób zapytania TTS po przekroczeniu limitu zapytań, błędzie połączenia
+# lub błędzie serwera (jedyne ponawianie - klient OpenAI nie ponawia zapytań TTS sam)
+TTS_MAX_RETRIES = 5
+
+# Katalog cache nagrań TTS między uruchomieniami (None = katalog tymczasowy systemu,
+# można nadpisać zmienną TTS_CACHE_DIR)
+TTS_CACHE_DIR = None
+
+# ============================================================
+# KONFIGURACJA LOGOWANIA
+# ============================================================
+
+# Poziom logów aplikacji (DEBUG pokazuje szczegóły generowania audio,
+# można nadpisać zmienną LOG_LEVEL)
+LOG_LEVEL = "INFO"
+
 # ============================================================
 # KONFIGURACJA KATEGORII SŁÓWEK
 # ============================================================
@@ -90,6 +110,21 @@ ex: She is very ambitious and hardworking.
 
 Zawsze odpowiadaj po polsku, ale słówka i przykłady podawaj po angielsku z polskim tłumaczeniem."""
 
+# Prompt systemowy przy generowaniu listy słówek w formacie JSON (structured outputs)
+# - bez wzoru tekstowego z SYSTEM_PROMPT, który kłóciłby się ze schematem odpowiedzi
+WORDS_SYSTEM_PROMPT = """Jesteś ekspertem od nauki języka angielskiego. Generujesz listy słówek angielskich dla polskich uczniów.
+
+WAŻNE ZASADY:
+- Odpowiadasz wyłącznie obiektem JSON zgodnym z podanym schematem - bez dodatkowego tekstu
+- Każde słówko to osobny obiekt na liście "words"
+- english: samo słówko lub wyrażenie angielskie (bez numeru i wymowy)
+- pronunciation: wymowa fonetyczna zapisana po polsku, bez nawiasów
+- polish: polskie tłumaczenie
+- example: jedno przykładowe zdanie po angielsku (bez przedrostka "ex:")
+- category: nazwa kategorii wielkimi literami (np. CZASOWNIKI, PRZYMIOTNIKI, PHRASAL VERBS)
+- Wartości pól zapisuj w jednej linii (bez znaków nowej linii)
+- Słówka z tej samej kategorii podawaj po kolei"""
+
 # ============================================================
 # PROMPT DO GENEROWANIA SŁÓWEK
 # ============================================================
@@ -100,26 +135,57 @@ WAŻNE:
 1. NIE POWTARZAJ tych słówek, które już były wygenerowane wcześniej:
 {existing_words}
 
-2. Użyj dokładnie tego formatu dla każdego słówka:
-[numer]. [słówko angielskie] ([wymowa fonetyczna]) – [polskie tłumaczenie]
-ex: [przykładowe zdanie po angielsku]
-
-3. Pogrupuj słówka według kategorii (np. CZASOWNIKI, PRZYMIOTNIKI, PHRASAL VERBS, RZECZOWNIKI)
-4. Każda kategoria powinna być oddzielona linią: ---------------------
+2. Dla każdego słówka podaj:
+- number: kolejny numer słówka (od 1)
+- english: słówko angielskie
+- pronunciation: wymowa fonetyczna zapisana po polsku (np. akomplisz)
+- polish: polskie tłumaczenie
+- example: przykładowe zdanie po angielsku
+- category: kategoria (np. CZASOWNIKI, PRZYMIOTNIKI, PHRASAL VERBS, RZECZOWNIKI)
 
-Przykład poprawnego formatu:
-CZASOWNIKI
+3. Pogrupuj słówka według kategorii - słówka z tej samej kategorii podawaj po kolei
 
-1. accomplish (akomplisz) – osiągnąć, dokonać
-ex: She accomplished her goal of running a marathon.
+Przykład poprawnego słówka:
+{{"number": 1, "english": "accomplish", "pronunciation": "akomplisz", "polish": "osiągnąć, dokonać", "example": "She accomplished her goal of running a marathon.", "category": "CZASOWNIKI"}}
 
-2. achieve (acziww) – osiągnąć
-ex: He achieved great success in his career.
-
--------------------------------------------------------------------------------------
-PRZYMIOTNIKI
+Wygeneruj teraz {count} nowych, unikalnych słówek:"""
 
-3. ambitious (ambiszys) – ambitny
-ex: She is very ambitious and hardworking.
+# ============================================================
+# FORMAT ODPOWIEDZI PRZY GENEROWANIU SŁÓWEK
+# ============================================================
 
-Wygeneruj teraz {count} nowych, unikalnych słówek:"""
+# Schemat JSON odpowiedzi (structured outputs) - model zwraca gotową listę słówek,
+# więc wygenerowanego tekstu nie trzeba parsować wyrażeniami regularnymi
+WORDS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "word_list",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "words": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "number": {"type": "integer"},
+                            "english": {"type": "string"},
+                            "pronunciation": {"type": "string"},
+                            "polish": {"type": "string"},
+                            "example": {"type": "string"},
+                            "category": {"type": "string"}
+                        },
+                        "required": [
+                            "number", "english", "pronunciation",
+                            "polish", "example", "category"
+                        ],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["words"],
+            "additionalProperties": False
+        }
+    }
+}
@@ -3,9 +3,24 @@
 Plik inicjalizujący moduł utils
 """
 
-# Importowanie wszystkich modułów pomocniczych
-from .openai_helper import OpenAIHelper
-from .word_generator import WordGenerator
-from .audio_generator import AudioGenerator
-from .database import DatabaseManager
-from .word_parser import WordParser
+import importlib
+
+# Moduły pomocnicze ładowane leniwie (przy pierwszym użyciu) - import jednego
+# modułu, np. utils.database, nie ładuje python-docx, openai ani FFmpeg
+_LAZY_IMPORTS = {
+    "OpenAIHelper": ".openai_helper",
+    "WordGenerator": ".word_generator",
+    "AudioGenerator": ".audio_generator",
+    "DatabaseManager": ".database",
+    "WordParser": ".word_parser",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    # Importowanie modułu pomocniczego dopiero przy odwołaniu do klasy
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
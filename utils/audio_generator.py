@@ -3,6 +3,7 @@
 Moduł do generowania plików audio MP3 z listy słówek
 Wykorzystuje OpenAI TTS + FFmpeg do łączenia plików
 Każde hasło generowane osobno - eliminuje halucynacje TTS
+Zapytania TTS wysyłane równolegle (asyncio + AsyncOpenAI)
 BEZ PYDUB - bezpośrednio FFmpeg concat
 """
 
@@ -11,8 +12,25 @@ import tempfile
 import os
 import subprocess
 import shutil
+import asyncio
+import random
+import hashlib
+import logging
+import threading
 
-from config import DEFAULT_VOICE, TEST_PAUSE_DURATION
+from openai import RateLimitError, APIConnectionError, InternalServerError
+
+from config import (
+    DEFAULT_VOICE,
+    OPENAI_TTS_MODEL,
+    TEST_PAUSE_DURATION,
+    TTS_CACHE_DIR,
+    TTS_CONCURRENCY,
+    TTS_MAX_RETRIES
+)
+
+# Logger modułu (poziom ustawiany w aplikacji - LOG_LEVEL w config.py)
+log = logging.getLogger(__name__)
 
 # Znajdź FFmpeg - preferuj wersję z winget (ma libmp3lame)
 FFMPEG_PATH = None
@@ -30,7 +48,53 @@ for path in possible_paths:
 if not FFMPEG_PATH:
     FFMPEG_PATH = "ffmpeg"  # Fallback
 
-print(f"[AUDIO] FFmpeg: {FFMPEG_PATH}")
+log.info("[AUDIO] FFmpeg: %s", FFMPEG_PATH)
+
+# Pliki tymczasowe w pamięci RAM (tmpfs), jeśli system go udostępnia
+TEMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Pliki ciszy współdzielone przez wszystkie generowania (nie są usuwane po nagraniu):
+# (długość w ms, częstotliwość, kanały) -> ścieżka; blokada chroni przed równoległym generowaniem
+_SILENCE_DIR = os.path.join(TEMP_ROOT or tempfile.gettempdir(), "english_tutor_silence")
+_SILENCE_CACHE = {}
+_SILENCE_LOCK = threading.Lock()
+
+# Katalog cache nagrań TTS (te same teksty nie są ponownie wysyłane do API)
+TTS_CACHE_PATH = (os.getenv("TTS_CACHE_DIR") or TTS_CACHE_DIR
+                  or os.path.join(tempfile.gettempdir(), "english_tutor_tts"))
+
+# Domyślne parametry ciszy (częstotliwość próbkowania, liczba kanałów) - jak MP3 z OpenAI TTS.
+# Gdy wszystkie nagrania mają wspólne parametry, cisza generowana jest z nimi
+# (pliki łączone bez ponownego kodowania)
+_AUDIO_PARAMS = (24000, 1)
+
+# Liczba bajtów czytanych z początku pliku przy odczycie parametrów (nagłówek ID3 + ramka)
+_HEADER_READ_SIZE = 64 * 1024
+
+
+def _mp3_params(data: bytes):
+    """Odczytuje (częstotliwość, liczba kanałów) z nagłówka pierwszej ramki MP3 (None - nie MP3)"""
+    pos = 0
+    
+    # Pominięcie znacznika ID3v2 (rozmiar zapisany w 4 bajtach po 7 bitów)
+    if data[:3] == b'ID3' and len(data) >= 10:
+        pos = 10 + ((data[6] & 0x7f) << 21 | (data[7] & 0x7f) << 14
+                    | (data[8] & 0x7f) << 7 | (data[9] & 0x7f))
+    
+    # Szukanie synchronizacji ramki (11 bitów ustawionych) z poprawnym nagłówkiem Layer III
+    pos = data.find(b'\xff', pos)
+    while pos != -1 and pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version = (b1 >> 3) & 3    # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+        layer = (b1 >> 1) & 3      # 1 = Layer III
+        rate_index = (b2 >> 2) & 3
+        if (b1 & 0xe0) == 0xe0 and version != 1 and layer == 1 and rate_index != 3:
+            sample_rate = (44100, 48000, 32000)[rate_index] >> {3: 0, 2: 1, 0: 2}[version]
+            channels = 1 if (b3 >> 6) == 3 else 2
+            return sample_rate, channels
+        pos = data.find(b'\xff', pos + 1)
+    
+    return None
 
 
 class AudioGenerator:
@@ -43,165 +107,345 @@ class AudioGenerator:
         self.openai = openai_helper
         self._temp_dir = None
         self._file_counter = 0
+        # Katalog cache nagrań TTS (None - cache wyłączony, np. brak uprawnień)
+        try:
+            os.makedirs(TTS_CACHE_PATH, exist_ok=True)
+            self._cache_dir = TTS_CACHE_PATH
+        except OSError as e:
+            log.warning("[TTS CACHE] Cache wyłączony: %s", e)
+            self._cache_dir = None
     
     def generate_audio(self, words: list, settings: dict) -> BytesIO:
-        """Generuje plik audio MP3 z listy słówek"""
+        """Generuje plik audio MP3 z listy słówek (wersja synchroniczna)"""
+        return asyncio.run(self.generate_audio_async(words, settings))
+    
+    async def generate_audio_async(self, words: list, settings: dict) -> BytesIO:
+        """Generuje plik audio MP3 z listy słówek - zapytania TTS wysyłane równolegle"""
         speed = settings.get('speed', 1.0)
         pause_between = settings.get('pause_between', 2.0)
         repetitions = settings.get('repetitions', 1)
         include_examples = settings.get('include_examples', True)
         test_mode = settings.get('test_mode', None)
         voice = settings.get('voice', DEFAULT_VOICE)
+        merge_utterances = settings.get('merge_utterances', False)
         
-        print(f"\n=== GENEROWANIE AUDIO ===")
-        print(f"Liczba haseł: {len(words)}")
-        print(f"Przerwa między hasłami: {pause_between}s")
+        log.info("=== GENEROWANIE AUDIO === haseł: %d, przerwa między hasłami: %ss",
+                 len(words), pause_between)
         
-        # Katalog tymczasowy na pliki MP3
-        self._temp_dir = tempfile.mkdtemp(prefix="audio_")
+        # Katalog tymczasowy na pliki MP3 (w RAM, jeśli dostępny)
+        self._temp_dir = tempfile.mkdtemp(prefix="audio_", dir=TEMP_ROOT)
         self._file_counter = 0
         
-        # Lista plików do połączenia
-        file_list = []
+        # Plan nagrania: nazwa przerwy (str) lub indeks tekstu do TTS (int)
+        plan = []
+        
+        # Długości przerw (pliki ciszy tworzone po pobraniu nagrań - z ich parametrami)
+        pauses = {'1s': 1.0, 'between': pause_between, 'test': TEST_PAUSE_DURATION}
+        
+        # Teksty do wysłania do TTS: tekst -> indeks (identyczne teksty wysyłane raz,
+        # głos i szybkość są wspólne dla całego nagrania)
+        utterances = {}
         
         try:
-            # Generowanie ciszy (przerwy)
-            silence_1s_path = self._generate_silence(1.0)
-            silence_between_path = self._generate_silence(pause_between)
-            silence_test_path = self._generate_silence(TEST_PAUSE_DURATION)
+            # Pole hasła jako tekst bez białych znaków (brak pola = pusty tekst)
+            def field(word, key):
+                return (word.get(key) or '').strip()
             
             # Przetwarzanie każdego hasła
             for i, word in enumerate(words, 1):
-                english = (word.get('english') or '').strip()
-                polish = (word.get('polish') or '').strip()
-                example = (word.get('example') or '').strip()
+                english = field(word, 'english')
+                polish = field(word, 'polish')
+                example = field(word, 'example')
                 
                 if not english or not polish:
                     continue
                 
-                # Czyszczenie
+                # Czyszczenie (tekst przed pierwszym nawiasem)
                 if '(' in english:
-                    english = english.split('(')[0].strip()
+                    english = english.partition('(')[0].rstrip()
                 
-                print(f"\n[{i}/{len(words)}] Hasło #{word.get('number', i)}:")
-                print(f"  EN: '{english}'")
-                print(f"  PL: '{polish}'")
+                log.debug("[%d/%d] Hasło #%s: EN: '%s', PL: '%s'",
+                          i, len(words), word.get('number', i), english, polish)
                 
-                # Generowanie audio dla hasła
-                word_files = self._generate_word_files(
+                # Plan nagrania dla hasła
+                word_items = self._plan_word(
                     english, polish, example,
-                    include_examples, test_mode,
-                    speed, voice,
-                    silence_1s_path, silence_test_path
+                    include_examples, test_mode, merge_utterances,
+                    utterances
                 )
                 
                 # Powtórzenia
                 for rep in range(repetitions):
-                    file_list.extend(word_files)
+                    plan.extend(word_items)
                     if rep < repetitions - 1:
-                        file_list.append(silence_1s_path)
+                        plan.append('1s')
                 
                 # Przerwa między hasłami (oprócz ostatniego)
                 if i < len(words):
-                    file_list.append(silence_between_path)
+                    plan.append('between')
+            
+            # Nagrania z cache - do TTS trafiają tylko brakujące teksty (kolejność zgodna z indeksami)
+            texts = list(utterances)
+            audio_paths = [self._cache_path(text, voice, speed) for text in texts]
+            missing = [i for i, path in enumerate(audio_paths)
+                       if not (path and os.path.exists(path))]
+            log.info("[TTS CACHE] %d/%d nagrań z cache", len(texts) - len(missing), len(texts))
+            
+            # Równoległe wysłanie brakujących zapytań TTS
+            audio_chunks = await self._tts_all([texts[i] for i in missing], speed, voice)
+            
+            # Zapis nowych nagrań do cache (lub do katalogu tymczasowego) wraz z ich parametrami MP3
+            # (parametry zapamiętane tylko na czas tego generowania)
+            new_params = {}
+            for i, chunk in zip(missing, audio_chunks):
+                path = self._bytes_to_file(texts[i], chunk, audio_paths[i])
+                new_params[path] = _mp3_params(chunk)
+                audio_paths[i] = path
+            
+            # Łączenie bez kodowania tylko gdy wszystkie nagrania (także z cache)
+            # mają te same parametry - cisza generowana z tymi parametrami
+            params, stream_copy = self._common_params(audio_paths, new_params)
+            
+            # Generowanie ciszy (przerwy) - jedno wywołanie FFmpeg dla wszystkich długości
+            silences = dict(zip(pauses, self._generate_silences(list(pauses.values()), params)))
             
-            print(f"\n=== ŁĄCZENIE {len(file_list)} PLIKÓW ===")
+            # Lista plików do połączenia
+            file_list = [audio_paths[item] if isinstance(item, int) else silences[item]
+                         for item in plan]
+            
+            log.info("=== ŁĄCZENIE %d PLIKÓW ===", len(file_list))
             
             # Łączenie plików przez FFmpeg
             output_path = os.path.join(self._temp_dir, "output.mp3")
-            self._concat_files(file_list, output_path)
+            self._concat_files(file_list, output_path, stream_copy)
             
             # Wczytanie wyniku
             if os.path.exists(output_path):
                 file_size = os.path.getsize(output_path)
-                print(f"✅ Wynik: {file_size} bajtów ({file_size/1024:.1f} KB)")
+                log.info("✅ Wynik: %d bajtów (%.1f KB)", file_size, file_size / 1024)
                 
-                buffer = BytesIO()
+                # BytesIO używa wczytanych bajtów bez dodatkowej kopii
                 with open(output_path, 'rb') as f:
-                    buffer.write(f.read())
-                buffer.seek(0)
-                return buffer
+                    return BytesIO(f.read())
             else:
-                print("❌ Nie utworzono pliku wyjściowego")
+                log.error("❌ Nie utworzono pliku wyjściowego")
                 return BytesIO()
                 
         finally:
             # Czyszczenie plików tymczasowych
             self._cleanup()
     
-    def _generate_silence(self, duration_sec: float) -> str:
-        """Generuje plik ciszy o zadanej długości"""
-        self._file_counter += 1
-        path = os.path.join(self._temp_dir, f"silence_{self._file_counter}.mp3")
+    def _generate_silences(self, durations: list, params: tuple = _AUDIO_PARAMS) -> list:
+        """Zwraca pliki ciszy o zadanych długościach i parametrach (częstotliwość, kanały) -
+        brakujące generuje jednym wywołaniem FFmpeg (pliki współdzielone między generowaniami,
+        ta sama długość i parametry - ten sam plik)"""
+        sample_rate, channels = params
+        keys = [(int(round(d * 1000)), sample_rate, channels) for d in durations]
         
-        # FFmpeg generuje ciszę
-        cmd = [
-            FFMPEG_PATH, '-y',
-            '-f', 'lavfi',
-            '-i', f'anullsrc=r=24000:cl=mono',
-            '-t', str(duration_sec),
-            '-acodec', 'libmp3lame',
-            '-b:a', '128k',
-            path
-        ]
+        with _SILENCE_LOCK:
+            # Długości, dla których nie ma jeszcze pliku (bez powtórzeń)
+            missing = {}
+            for key in keys:
+                if key in missing:
+                    continue
+                # Plik z cache mógł zostać usunięty (np. czyszczenie katalogu tymczasowego)
+                if key in _SILENCE_CACHE and os.path.exists(_SILENCE_CACHE[key]):
+                    continue
+                path = os.path.join(_SILENCE_DIR, f"silence_{key[0]}ms_{sample_rate}_{channels}.mp3")
+                if os.path.exists(path) and os.path.getsize(path) > 0:
+                    # Plik z poprzedniego uruchomienia aplikacji
+                    _SILENCE_CACHE[key] = path
+                else:
+                    _SILENCE_CACHE.pop(key, None)
+                    missing[key] = path
+            
+            if missing:
+                os.makedirs(_SILENCE_DIR, exist_ok=True)
+                
+                # FFmpeg generuje ciszę - jedno wejście, osobne wyjście dla każdej długości
+                # (pliki robocze przenoszone na miejsce po zakończeniu - inne procesy
+                # nigdy nie widzą niepełnego pliku). Unikalne nazwy plików roboczych (mkstemp) -
+                # bez kolizji między procesami i wątkami
+                tmp_paths = {}
+                for key, path in missing.items():
+                    fd, tmp_paths[key] = tempfile.mkstemp(suffix=".tmp", dir=_SILENCE_DIR)
+                    os.close(fd)
+                layout = 'mono' if channels == 1 else 'stereo'
+                cmd = [
+                    FFMPEG_PATH, '-y', '-loglevel', 'error',
+                    '-f', 'lavfi',
+                    '-i', f'anullsrc=r={sample_rate}:cl={layout}'
+                ]
+                for key in missing:
+                    cmd += [
+                        '-t', str(key[0] / 1000),
+                        '-acodec', 'libmp3lame',
+                        '-b:a', '128k',
+                        '-f', 'mp3',
+                        tmp_paths[key]
+                    ]
+                
+                result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                if result.returncode != 0:
+                    # Bez plików ciszy nagranie byłoby niepełne - usunięcie plików roboczych i błąd
+                    error = result.stderr[:200].decode('utf-8', 'replace')
+                    log.error("[SILENCE] Błąd (kod %d): %s", result.returncode, error)
+                    for tmp_path in tmp_paths.values():
+                        try:
+                            os.remove(tmp_path)
+                        except OSError:
+                            pass
+                    raise RuntimeError(f"Nie udało się wygenerować ciszy (FFmpeg, kod {result.returncode}): {error}")
+                
+                for key, path in missing.items():
+                    os.replace(tmp_paths[key], path)
+                    _SILENCE_CACHE[key] = path
+                    log.debug("[SILENCE] %ss -> %d B", key[0] / 1000, os.path.getsize(path))
+            
+            return [_SILENCE_CACHE[key] for key in keys]
+    
+    def _common_params(self, audio_paths: list, new_params: dict):
+        """Zwraca (parametry ciszy, czy łączyć bez kodowania) na podstawie parametrów MP3
+        wszystkich nagrań planu (new_params - nowe nagrania; z cache - odczyt nagłówka pliku)"""
+        found = {new_params[path] if path in new_params else self._clip_params(path)
+                 for path in audio_paths}
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"[SILENCE] Błąd (kod {result.returncode}): {result.stderr[:200]}")
-        else:
-            size = os.path.getsize(path) if os.path.exists(path) else 0
-            print(f"[SILENCE] {duration_sec}s -> {size} B")
+        if len(found) > 1 or None in found:
+            log.warning("[AUDIO] Nagrania TTS o różnych parametrach %s - łączenie z kodowaniem", found)
+            return _AUDIO_PARAMS, False
         
-        return path
+        # Wspólne parametry nagrań (brak nagrań - parametry domyślne)
+        return (found.pop() if found else _AUDIO_PARAMS), True
+    
+    def _clip_params(self, path: str):
+        """Parametry MP3 nagrania z cache (częstotliwość, kanały) odczytane z nagłówka pliku lub None
+        (odczyt tylko początku pliku, raz na nagranie w danym generowaniu)"""
+        try:
+            with open(path, 'rb') as f:
+                return _mp3_params(f.read(_HEADER_READ_SIZE))
+        except OSError as e:
+            log.warning("[AUDIO] Błąd odczytu %s: %s", path, e)
+            return None
     
-    def _generate_word_files(self, english, polish, example,
-                              include_examples, test_mode, speed, voice,
-                              silence_1s, silence_test) -> list:
-        """Generuje pliki MP3 dla jednego hasła"""
-        files = []
+    def _plan_word(self, english, polish, example,
+                   include_examples, test_mode, merge_utterances, utterances) -> list:
+        """Buduje plan nagrania dla jednego hasła (teksty trafiają do utterances,
+        przerwy zapisywane jako nazwy: '1s', 'test')"""
+        def tts(text):
+            # Indeks tekstu na liście zapytań TTS (powtórzony tekst - ten sam indeks)
+            return utterances.setdefault(text, len(utterances))
+        
+        items = []
         
         if test_mode == "pl_to_en":
             # Polski -> pauza -> angielski
-            files.append(self._text_to_file(polish, speed, voice))
-            files.append(silence_test)
-            files.append(self._text_to_file(english, speed, voice))
+            items.append(tts(polish))
+            items.append('test')
+            items.append(tts(english))
             
         elif test_mode == "en_to_pl":
             # Angielski -> pauza -> polski
-            files.append(self._text_to_file(english, speed, voice))
-            files.append(silence_test)
-            files.append(self._text_to_file(polish, speed, voice))
+            items.append(tts(english))
+            items.append('test')
+            items.append(tts(polish))
+            
+        elif merge_utterances:
+            # Jedno zapytanie TTS na hasło - przerwy wynikają z kropek i pustych linii
+            # (puste części pomijane, np. słówko zaczynające się od nawiasu)
+            parts = [english, polish]
+            if include_examples and example:
+                parts.append(example)
+            items.append(tts("\n\n".join(
+                part if part[-1] in '.!?' else part + '.' for part in parts if part
+            )))
             
         else:
             # Normalny: angielski -> 1s -> polski -> 1s -> przykład
-            files.append(self._text_to_file(english, speed, voice))
-            files.append(silence_1s)
-            files.append(self._text_to_file(polish, speed, voice))
+            items.append(tts(english))
+            items.append('1s')
+            items.append(tts(polish))
             
             if include_examples and example:
-                files.append(silence_1s)
-                files.append(self._text_to_file(example, speed, voice))
+                items.append('1s')
+                items.append(tts(example))
         
-        return files
+        return items
     
-    def _text_to_file(self, text: str, speed: float, voice: str) -> str:
-        """Konwertuje tekst na plik MP3 przez OpenAI TTS"""
+    async def _tts_all(self, texts: list, speed: float, voice: str) -> list:
+        """Wysyła równolegle zapytania TTS (ograniczone semaforem), zachowuje kolejność"""
+        concurrency = int(os.getenv("TTS_CONCURRENCY", TTS_CONCURRENCY))
+        sem = asyncio.Semaphore(concurrency)
+        
+        log.info("=== TTS: %d zapytań (max %d równolegle) ===", len(texts), concurrency)
+        
+        async def bounded(coro):
+            async with sem:
+                return await coro
+        
+        # Klient asynchroniczny (HTTP/2) tworzony na czas jednego generowania (jedna pętla zdarzeń)
+        async with self.openai.create_async_client() as client:
+            return await asyncio.gather(*[
+                bounded(self._tts_one(client, text, voice, speed)) for text in texts
+            ])
+    
+    async def _tts_one(self, client, text: str, voice: str, speed: float) -> bytes:
+        """Konwertuje tekst na mowę przez OpenAI TTS (ponawia przy limicie zapytań,
+        błędach połączenia i błędach serwera - klient nie ponawia zapytań sam)"""
+        delay = 1.0
+        for attempt in range(TTS_MAX_RETRIES):
+            try:
+                return await self.openai.text_to_speech_async(client, text, voice, speed)
+            except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                if attempt == TTS_MAX_RETRIES - 1:
+                    raise
+                # Wykładnicze wydłużanie przerwy z losowym rozrzutem
+                wait = delay * (1 + random.random())
+                log.warning("[TTS] %s - ponowienie za %.1fs", type(e).__name__, wait)
+                await asyncio.sleep(wait)
+                delay *= 2
+    
+    def _cache_path(self, text: str, voice: str, speed: float):
+        """Ścieżka nagrania w cache (klucz: model, głos, szybkość i tekst) lub None"""
+        if not self._cache_dir:
+            return None
+        key = hashlib.sha256(f"{OPENAI_TTS_MODEL}|{voice}|{speed}|{text}".encode('utf-8')).hexdigest()
+        return os.path.join(self._cache_dir, f"{key}.mp3")
+    
+    def _bytes_to_file(self, text: str, audio_bytes: bytes, cache_path: str = None) -> str:
+        """Zapisuje nagranie MP3 do cache (atomowo) lub do pliku tymczasowego"""
+        log.debug("[TTS] '%s...' -> %d B", text[:25], len(audio_bytes))
+        
+        # Zapis do cache: plik roboczy obok docelowego + os.replace (atomowe),
+        # więc inne procesy nigdy nie widzą niepełnego nagrania. Unikalna nazwa pliku
+        # roboczego (mkstemp) - sesje to wątki jednego procesu, ten sam tekst może być
+        # zapisywany jednocześnie
+        if cache_path:
+            tmp_path = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(cache_path))
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(audio_bytes)
+                os.replace(tmp_path, cache_path)
+                return cache_path
+            except OSError as e:
+                log.warning("[TTS CACHE] Błąd zapisu: %s", e)
+                if tmp_path:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+        
         self._file_counter += 1
         path = os.path.join(self._temp_dir, f"audio_{self._file_counter}.mp3")
         
-        # Konwersja przez OpenAI TTS
-        audio_bytes = self.openai.text_to_speech(text, voice=voice, speed=speed)
-        
         with open(path, 'wb') as f:
             f.write(audio_bytes)
         
-        size = os.path.getsize(path)
-        print(f"[TTS] '{text[:25]}...' -> {size} B")
-        
         return path
     
-    def _concat_files(self, file_list: list, output_path: str):
-        """Łączy pliki MP3 przez FFmpeg concat"""
+    def _concat_files(self, file_list: list, output_path: str, stream_copy: bool = True):
+        """Łączy pliki MP3 przez FFmpeg concat (kopiowanie ramek MP3 lub, gdy parametry
+        plików się różnią albo kopiowanie się nie powiedzie, ponowne kodowanie)"""
         # Tworzenie pliku z listą
         list_path = os.path.join(self._temp_dir, "filelist.txt")
         with open(list_path, 'w', encoding='utf-8') as f:
@@ -212,28 +456,34 @@ class AudioGenerator:
         
         # FFmpeg concat
         cmd = [
-            FFMPEG_PATH, '-y',
+            FFMPEG_PATH, '-y', '-loglevel', 'error',
             '-f', 'concat',
             '-safe', '0',
-            '-i', list_path,
-            '-acodec', 'libmp3lame',
-            '-b:a', '128k',
-            output_path
+            '-i', list_path
         ]
+        codec = ['-c', 'copy'] if stream_copy else ['-acodec', 'libmp3lame', '-b:a', '128k']
+        
+        log.debug("[FFMPEG] Łączenie plików...")
+        result = subprocess.run(cmd + codec + [output_path],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         
-        print(f"[FFMPEG] Łączenie plików...")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Kopiowanie ramek się nie powiodło - ponowna próba z kodowaniem
+        if result.returncode != 0 and stream_copy:
+            log.warning("[FFMPEG] Łączenie bez kodowania nie powiodło się - kodowanie MP3")
+            result = subprocess.run(cmd + ['-acodec', 'libmp3lame', '-b:a', '128k', output_path],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
         
         if result.returncode != 0:
-            print(f"[FFMPEG] BŁĄD (kod {result.returncode}): {result.stderr[-500:]}")
+            log.error("[FFMPEG] BŁĄD (kod %d): %s", result.returncode,
+                      result.stderr[-500:].decode('utf-8', 'replace'))
         else:
-            print(f"[FFMPEG] OK")
+            log.debug("[FFMPEG] OK")
     
     def _cleanup(self):
         """Usuwa pliki tymczasowe"""
         if self._temp_dir and os.path.exists(self._temp_dir):
             try:
                 shutil.rmtree(self._temp_dir)
-                print("[CLEANUP] Usunięto pliki tymczasowe")
+                log.debug("[CLEANUP] Usunięto pliki tymczasowe")
             except Exception as e:
-                print(f"[CLEANUP] Błąd: {e}")
+                log.warning("[CLEANUP] Błąd: %s", e)
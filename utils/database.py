@@ -6,8 +6,16 @@ Przechowuje pliki Word oraz historię wygenerowanych słówek
 
 # Importowanie bibliotek do komunikacji HTTP
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 
+# Blokada stanu historii (manager współdzielony przez wszystkie sesje Streamlit)
+import threading
+
+# Szybka serializacja JSON historii słówek
+import orjson
+
 # Importowanie bibliotek do operacji na plikach
 from io import BytesIO
 from datetime import datetime
@@ -37,8 +45,48 @@ class DatabaseManager:
             "Authorization": f"Bearer {token}"
         }
         
-        # Nazwa pliku z historią słówek
-        self.history_filename = "words_history.json"
+        # Nazwa pliku z historią słówek (NDJSON - jedno słówko w linii, tylko dopisywanie)
+        self.history_filename = "words_history.ndjson"
+        
+        # Poprzedni format historii (jeden obiekt JSON) - odczytywany, jeśli brak nowego pliku
+        self.legacy_history_filename = "words_history.json"
+        
+        # Wspólny początek nazw plików historii (filtr przy listowaniu plików)
+        self.history_prefix = "words_history."
+        
+        # Nazwa pliku z listą wysłanych batchy (OpenAI Batch API)
+        self.batches_filename = "batches.json"
+        
+        # Zapamiętany URL pliku historii (bez listowania plików przy każdym odczycie)
+        # oraz ostatnio pobrana historia z jej ETagiem (odpowiedź 304 = bez zmian)
+        self._history_url = None
+        self._history_etag = None
+        self._history_cache = None
+        
+        # Surowa zawartość pliku NDJSON (None - historia w starym formacie lub brak pliku)
+        self._history_raw = None
+        
+        # Blokada powyższego stanu historii - odczyt i dopisywanie z wielu wątków naraz
+        # (RLock - dopisywanie odczytuje historię, trzymając już blokadę)
+        self._history_lock = threading.RLock()
+        
+        # Sesja HTTP z pulą połączeń (ponowne użycie połączeń TCP+TLS)
+        # i ponawianiem żądań przy błędach serwera / limicie zapytań
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        
+        # Nagłówek autoryzacji dodawany do każdego żądania sesji
+        self._session.headers.update(self.headers)
     
     def upload_file(self, file_data: BytesIO, filename: str) -> dict:
         """
@@ -56,7 +104,6 @@ class DatabaseManager:
         
         # Nagłówki specyficzne dla uploadu
         headers = {
-            **self.headers,
             "x-api-version": "7",
             "Content-Type": "application/octet-stream"
         }
@@ -64,8 +111,9 @@ class DatabaseManager:
         # Przewinięcie bufora na początek
         file_data.seek(0)
         
-        # Wysłanie żądania PUT z danymi pliku
-        response = requests.put(url, headers=headers, data=file_data.read())
+        # Wysłanie żądania PUT z danymi pliku (requests czyta bufor kawałkami
+        # i sam ustala Content-Length z rozmiaru bufora)
+        response = self._session.put(url, headers=headers, data=file_data)
         
         # Sprawdzenie czy żądanie się powiodło
         response.raise_for_status()
@@ -84,7 +132,7 @@ class DatabaseManager:
             Dane pliku jako BytesIO
         """
         # Wysłanie żądania GET
-        response = requests.get(url, headers=self.headers)
+        response = self._session.get(url)
         
         # Sprawdzenie czy żądanie się powiodło
         response.raise_for_status()
@@ -92,24 +140,28 @@ class DatabaseManager:
         # Zwrócenie danych jako BytesIO
         return BytesIO(response.content)
     
-    def list_files(self) -> list:
+    def list_files(self, prefix: str = "") -> list:
         """
-        Pobiera listę wszystkich plików w Vercel Blob
+        Pobiera listę plików w Vercel Blob
         
+        Args:
+            prefix: Początek nazwy pliku (filtrowanie po stronie serwera, domyślnie wszystkie pliki)
+            
         Returns:
             Lista słowników z informacjami o plikach
         """
-        # URL do listowania plików
-        url = f"{self.BLOB_API_URL}?limit=1000"
+        # Parametry listowania plików
+        params = {"limit": 1000}
+        if prefix:
+            params["prefix"] = prefix
         
         # Nagłówki dla listowania
         headers = {
-            **self.headers,
             "x-api-version": "7"
         }
         
         # Wysłanie żądania GET
-        response = requests.get(url, headers=headers)
+        response = self._session.get(self.BLOB_API_URL, headers=headers, params=params)
         
         # Sprawdzenie czy żądanie się powiodło
         response.raise_for_status()
@@ -135,7 +187,6 @@ class DatabaseManager:
         
         # Nagłówki dla usuwania
         headers = {
-            **self.headers,
             "x-api-version": "7",
             "Content-Type": "application/json"
         }
@@ -144,7 +195,7 @@ class DatabaseManager:
         data = {"urls": [url]}
         
         # Wysłanie żądania POST
-        response = requests.post(delete_url, headers=headers, json=data)
+        response = self._session.post(delete_url, headers=headers, json=data)
         
         # Sprawdzenie czy żądanie się powiodło
         return response.status_code == 200
@@ -157,27 +208,59 @@ class DatabaseManager:
             Lista słówek (stringów) które już były wygenerowane
         """
         try:
-            # Pobieranie listy plików
-            files = self.list_files()
-            
-            # Szukanie pliku z historią
-            history_file = None
-            for f in files:
-                if f.get('pathname', '').endswith(self.history_filename):
-                    history_file = f
-                    break
-            
-            # Jeśli nie znaleziono pliku historii, zwracamy pustą listę
-            if not history_file:
-                return []
-            
-            # Pobieranie zawartości pliku historii
-            file_data = self.download_file(history_file['url'])
-            
-            # Parsowanie JSON
-            history = json.loads(file_data.read().decode('utf-8'))
-            
-            return history.get('words', [])
+            # Stan historii (URL, ETag, kopia) jest wspólny dla wszystkich sesji
+            # (jeden DatabaseManager w cache_resource) - odczyt i zapis po kolei
+            with self._history_lock:
+                # Szukanie pliku z historią (tylko przy pierwszym odczycie)
+                # - nowy format ma pierwszeństwo przed starym
+                if not self._history_url:
+                    legacy_url = None
+                    for f in self.list_files(prefix=self.history_prefix):
+                        pathname = f.get('pathname', '')
+                        if pathname.endswith(self.history_filename):
+                            self._history_url = f['url']
+                            break
+                        if pathname.endswith(self.legacy_history_filename):
+                            legacy_url = f['url']
+                    else:
+                        self._history_url = legacy_url
+                
+                # Jeśli nie znaleziono pliku historii, zwracamy pustą listę
+                if not self._history_url:
+                    return []
+                
+                # Pobieranie pliku historii (warunkowo, jeśli mamy już jego kopię)
+                headers = {}
+                if self._history_etag and self._history_cache is not None:
+                    headers["If-None-Match"] = self._history_etag
+                response = self._session.get(self._history_url, headers=headers)
+                
+                # Historia bez zmian - zwracamy zapamiętaną kopię
+                if response.status_code == 304:
+                    return list(self._history_cache)
+                
+                # Plik zniknął - następny odczyt wyszuka go ponownie
+                if response.status_code == 404:
+                    self._history_url = None
+                    self._history_cache = None
+                    self._history_raw = None
+                    return []
+                
+                response.raise_for_status()
+                
+                # Parsowanie: NDJSON (słówko JSON w każdej linii) lub stary format JSON
+                content = response.content
+                if self._history_url.endswith(self.legacy_history_filename):
+                    self._history_cache = orjson.loads(content).get('words', [])
+                    self._history_raw = None
+                else:
+                    self._history_cache = [orjson.loads(line) for line in content.splitlines() if line]
+                    self._history_raw = content
+                
+                # Zapamiętanie ETagu pobranej wersji
+                self._history_etag = response.headers.get('ETag')
+                
+                return list(self._history_cache)
             
         except Exception as e:
             # W przypadku błędu zwracamy pustą listę
@@ -186,7 +269,7 @@ class DatabaseManager:
     
     def add_words_to_history(self, new_words: list) -> bool:
         """
-        Dodaje nowe słówka do historii
+        Dodaje nowe słówka do historii (dopisuje linie na końcu pliku NDJSON)
         
         Args:
             new_words: Lista nowych słówek do dodania
@@ -195,42 +278,102 @@ class DatabaseManager:
             True jeśli zapisanie się powiodło
         """
         try:
-            # Pobieranie aktualnej historii
-            current_words = self.get_words_history()
+            # Odczyt, dopisanie i zapamiętanie nowej wersji jako jedna operacja
+            with self._history_lock:
+                # Pobieranie aktualnej historii
+                current_words = self.get_words_history()
+                
+                # Nowe słówka (unikalne, małe litery - sprawdzanie w zbiorze)
+                seen = set(current_words)
+                added = []
+                for word in new_words:
+                    word_lower = word.lower().strip()
+                    if word_lower and word_lower not in seen:
+                        seen.add(word_lower)
+                        added.append(word_lower)
+                
+                # Brak nowych słówek - nie ma czego zapisywać
+                if not added:
+                    return True
+                
+                # Nowe linie NDJSON; istniejąca zawartość nie jest ponownie serializowana
+                # (historia w starym formacie jest przepisywana do NDJSON w całości)
+                new_lines = b"".join(orjson.dumps(word) + b"\n" for word in added)
+                if self._history_raw is not None:
+                    content = self._history_raw + new_lines
+                else:
+                    content = b"".join(orjson.dumps(word) + b"\n" for word in current_words) + new_lines
+                
+                # Upload pliku historii
+                result = self.upload_file(BytesIO(content), self.history_filename)
+                
+                # Zapamiętanie zapisanej historii (ETag nowej wersji pobierzemy przy odczycie)
+                self._history_url = result.get('url', self._history_url)
+                self._history_cache = current_words + added
+                self._history_raw = content
+                self._history_etag = None
+                
+                return True
             
-            # Dodawanie nowych słówek (unikalne, małe litery)
-            for word in new_words:
-                word_lower = word.lower().strip()
-                if word_lower and word_lower not in current_words:
-                    current_words.append(word_lower)
+        except Exception as e:
+            print(f"Błąd zapisywania historii: {e}")
+            return False
+    
+    def get_batches(self) -> list:
+        """
+        Pobiera listę wysłanych batchy generowania słówek
+        
+        Returns:
+            Lista słowników z informacjami o batchach (id, tematy, data)
+        """
+        try:
+            # Szukanie pliku z listą batchy
+            files = self.list_files(prefix=self.batches_filename)
+            batches_file = None
+            for f in files:
+                if f.get('pathname', '').endswith(self.batches_filename):
+                    batches_file = f
+                    break
             
-            # Tworzenie struktury JSON
-            history_data = {
-                'words': current_words,
-                'last_updated': datetime.now().isoformat(),
-                'total_count': len(current_words)
-            }
+            # Jeśli nie znaleziono pliku, zwracamy pustą listę
+            if not batches_file:
+                return []
             
-            # Konwersja do JSON i BytesIO
-            json_str = json.dumps(history_data, ensure_ascii=False, indent=2)
-            file_data = BytesIO(json_str.encode('utf-8'))
+            # Pobieranie i parsowanie pliku
+            file_data = self.download_file(batches_file['url'])
+            return json.loads(file_data.read().decode('utf-8')).get('batches', [])
             
-            # Upload pliku historii
-            self.upload_file(file_data, self.history_filename)
+        except Exception as e:
+            print(f"Błąd pobierania listy batchy: {e}")
+            return []
+    
+    def save_batches(self, batches: list) -> bool:
+        """
+        Zapisuje listę wysłanych batchy generowania słówek
+        
+        Args:
+            batches: Lista słowników z informacjami o batchach
             
+        Returns:
+            True jeśli zapisanie się powiodło
+        """
+        try:
+            json_str = json.dumps({'batches': batches}, ensure_ascii=False, indent=2)
+            self.upload_file(BytesIO(json_str.encode('utf-8')), self.batches_filename)
             return True
-            
         except Exception as e:
-            print(f"Błąd zapisywania historii: {e}")
+            print(f"Błąd zapisywania listy batchy: {e}")
             return False
     
-    def save_word_document(self, doc_data: BytesIO, topic: str) -> dict:
+    def save_word_document(self, doc_data: BytesIO, topic: str, suffix: str = None) -> dict:
         """
         Zapisuje dokument Word z listą słówek
         
         Args:
             doc_data: Dane dokumentu jako BytesIO
             topic: Temat słówek (do nazwy pliku)
+            suffix: Dopisek do nazwy pliku, np. temat z batcha (bez niego kolejne
+                    dokumenty z tego samego dnia nadpisują się nawzajem)
             
         Returns:
             Słownik z informacjami o zapisanym pliku
@@ -241,6 +384,12 @@ class DatabaseManager:
         # Tworzenie nazwy pliku
         filename = f"Słówka {date_str}.docx"
         
+        # Nazwa z dopiskiem: Słówka rr.mm.dd - dopisek (tylko znaki bezpieczne w URL pliku)
+        if suffix:
+            safe_suffix = " ".join("".join(ch for ch in suffix if ch.isalnum() or ch in " -()").split())
+            if safe_suffix:
+                filename = f"Słówka {date_str} - {safe_suffix}.docx"
+        
         # Upload pliku
         return self.upload_file(doc_data, filename)
     
@@ -5,10 +5,20 @@ Obsługuje generowanie tekstu (GPT) oraz konwersję tekstu na mowę (TTS)
 """
 
 # Importowanie biblioteki OpenAI
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+
+# Biblioteka do tworzenia pliku JSONL dla Batch API
+import json
 
 # Importowanie konfiguracji
-from config import OPENAI_MODEL, OPENAI_TTS_MODEL, DEFAULT_VOICE, SYSTEM_PROMPT
+from config import (
+    OPENAI_MODEL,
+    OPENAI_TTS_MODEL,
+    DEFAULT_VOICE,
+    SYSTEM_PROMPT,
+    WORDS_SYSTEM_PROMPT,
+    WORDS_RESPONSE_FORMAT
+)
 
 
 class OpenAIHelper:
@@ -74,23 +84,123 @@ class OpenAIHelper:
             prompt: Prompt z instrukcjami generowania słówek
             
         Returns:
-            Wygenerowana lista słówek jako string
+            Wygenerowana lista słówek jako string JSON: {"words": [...]}
+            lub None, jeśli model odmówił odpowiedzi
         """
-        # Budowanie wiadomości dla API
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
+        # Wysłanie zapytania do API (odpowiedź w formacie JSON według schematu)
+        response = self.client.chat.completions.create(**self._words_request_body(prompt))
+        message = response.choices[0].message
+        
+        # Odmowa modelu (structured outputs) - powód w polu refusal, brak treści
+        if getattr(message, 'refusal', None):
+            return None
+        
+        # Zwrócenie wygenerowanej listy słówek
+        return message.content
+    
+    def _words_request_body(self, prompt: str) -> dict:
+        """
+        Buduje treść zapytania o listę słówek (wspólna dla zwykłego zapytania i Batch API)
+        
+        Args:
+            prompt: Prompt z instrukcjami generowania słówek
+            
+        Returns:
+            Parametry zapytania chat.completions
+        """
+        return {
+            "model": OPENAI_MODEL,
+            "messages": [
+                # Prompt systemowy dla odpowiedzi JSON (SYSTEM_PROMPT opisuje format tekstowy czatu)
+                {"role": "system", "content": WORDS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "response_format": WORDS_RESPONSE_FORMAT
+        }
+    
+    def create_words_batch(self, prompts: list) -> str:
+        """
+        Wysyła wiele zapytań o listy słówek jako jeden batch (OpenAI Batch API)
+        Batch jest tańszy od zwykłych zapytań, ale wynik może przyjść nawet po 24h
+        
+        Args:
+            prompts: Lista promptów (jeden prompt = jedna lista słówek)
+            
+        Returns:
+            ID utworzonego batcha
+        """
+        # Plik JSONL - jedna linia na zapytanie (custom_id = indeks promptu)
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._words_request_body(prompt)
+            }, ensure_ascii=False)
+            for i, prompt in enumerate(prompts)
         ]
         
-        # Wysłanie zapytania do API
-        response = self.client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
-            temperature=0.7
+        # Wysłanie pliku z zapytaniami
+        batch_file = self.client.files.create(
+            file=("words_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
         )
         
-        # Zwrócenie wygenerowanej listy słówek
-        return response.choices[0].message.content
+        # Utworzenie batcha
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        return batch.id
+    
+    def get_words_batch(self, batch_id: str) -> tuple:
+        """
+        Sprawdza status batcha i pobiera wyniki, jeśli jest gotowy
+        
+        Args:
+            batch_id: ID batcha
+            
+        Returns:
+            Krotka (status, wyniki, błędy) - wyniki to słownik {custom_id: odpowiedź JSON},
+            błędy to słownik {custom_id: opis błędu}; oba puste dopóki batch
+            nie jest zakończony
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        
+        results = {}
+        errors = {}
+        if batch.status == "completed":
+            # Pliki JSONL - jedna linia na zapytanie (udane zapytania w pliku wynikowym,
+            # nieudane w pliku błędów lub w pliku wynikowym z kodem innym niż 200)
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                content = self.client.files.content(file_id).text
+                for line in content.splitlines():
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    custom_id = item["custom_id"]
+                    response = item.get("response") or {}
+                    body = response.get("body") or {}
+                    
+                    if response.get("status_code") == 200:
+                        message = body["choices"][0]["message"]
+                        if message.get("content"):
+                            results[custom_id] = message["content"]
+                        else:
+                            # Odmowa modelu - odpowiedź bez treści
+                            errors[custom_id] = message.get("refusal") or "pusta odpowiedź modelu"
+                        continue
+                    
+                    # Opis błędu z odpowiedzi API lub z samego zapytania
+                    error = body.get("error") or item.get("error") or {}
+                    errors[custom_id] = error.get("message") or f"kod odpowiedzi {response.get('status_code')}"
+        
+        return batch.status, results, errors
     
     def text_to_speech(self, text: str, voice: str = DEFAULT_VOICE, speed: float = 1.0) -> bytes:
         """
@@ -115,6 +225,44 @@ class OpenAIHelper:
         # Zwrócenie danych audio jako bytes
         return response.content
     
+    def create_async_client(self) -> AsyncOpenAI:
+        """
+        Tworzy asynchroniczny klient OpenAI z HTTP/2
+        (wiele równoległych zapytań TTS współdzieli jedno połączenie)
+        
+        Returns:
+            Klient AsyncOpenAI (do użycia w "async with" w ramach jednej pętli zdarzeń)
+        """
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=DefaultAsyncHttpxClient(http2=True),
+            # Bez ponowień w SDK - zapytania TTS ponawia AudioGenerator (TTS_MAX_RETRIES),
+            # inaczej oba mechanizmy ponawiałyby to samo zapytanie
+            max_retries=0
+        )
+    
+    async def text_to_speech_async(self, client: AsyncOpenAI, text: str,
+                                   voice: str = DEFAULT_VOICE, speed: float = 1.0) -> bytes:
+        """
+        Konwertuje tekst na mowę przy użyciu OpenAI TTS (wersja asynchroniczna)
+        
+        Args:
+            client: Klient z create_async_client()
+            text: Tekst do konwersji na mowę
+            voice: Głos lektora (domyślnie 'echo')
+            speed: Szybkość mowy (0.25 - 4.0, domyślnie 1.0)
+            
+        Returns:
+            Dane audio w formacie MP3 jako bytes
+        """
+        response = await client.audio.speech.create(
+            model=OPENAI_TTS_MODEL,
+            voice=voice,
+            input=text,
+            speed=speed
+        )
+        return response.content
+    
     def test_connection(self) -> bool:
         """
         Testuje połączenie z API OpenAI
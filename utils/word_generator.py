@@ -8,8 +8,11 @@ Tworzy dokumenty w formacie zgodnym z przykładem użytkownika
 from docx import Document
 from docx.shared import Pt, Inches, Cm, Twips
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+
+# Zamiana znaków specjalnych XML (&, <, >) na encje w treści dokumentu
+from xml.sax.saxutils import escape
 
 # Importowanie biblioteki do operacji na plikach
 from io import BytesIO
@@ -17,6 +20,25 @@ from io import BytesIO
 # Importowanie wyrażeń regularnych do parsowania tekstu
 import re
 
+# Wspólny silnik parsowania listy słówek i pomocnicze funkcje linii
+from utils.word_parser import parse_lines, iter_lines, is_separator, is_category
+
+
+# Wzorce linii kompilowane raz przy imporcie modułu
+
+# Linia ze słówkiem w dokumencie Word: numer. słówko (wymowa) – tłumaczenie
+_DOC_WORD_RE = re.compile(
+    r'(?P<number>\d+)\.\s+(?P<english>.+?)\s*\((?P<pronunciation>[^)]+)\)\s*[–-]\s*(?P<polish>.+)$'
+)
+
+# Linia ze słówkiem przy parsowaniu tekstu (słówko angielskie: litery i spacje)
+_TEXT_WORD_RE = re.compile(
+    r'(?P<number>\d+)\.\s+(?P<english>[a-zA-Z\s]+)\s*\((?P<pronunciation>[^)]+)\)\s*[–-]\s*(?P<polish>.+)'
+)
+
+# Podział tekstu fragmentu na tabulatory / znaki nowej linii i zwykły tekst
+_CONTROL_SPLIT_RE = re.compile(r'([\t\r\n])')
+
 
 class WordGenerator:
     """
@@ -32,6 +54,15 @@ class WordGenerator:
         self.default_font_size = Pt(11)
         # Odstęp między hasłami (4 punkty)
         self.spacing_after = Pt(4)
+        
+        # Szablony XML paragrafów i fragmentów tekstu - cała treść dokumentu
+        # składana jest jako jeden tekst XML i parsowana jednorazowo
+        self._ppr_xml = f'<w:pPr><w:spacing w:after="{self.spacing_after.twips}"/></w:pPr>'
+        # Pusty paragraf - bez odstępu po nim
+        self._empty_para_xml = '<w:p><w:pPr><w:spacing w:after="0"/></w:pPr></w:p>'
+        
+        # Zapamiętane szablony formatowania w:rPr - klucz (czcionka, rozmiar, pogrubienie)
+        self._rpr_cache = {}
     
     def _set_narrow_margins(self, doc):
         """
@@ -74,24 +105,101 @@ class WordGenerator:
             # Dodanie do sekcji
             sectPr.append(cols)
     
-    def _format_paragraph(self, paragraph, is_bold=False):
+    def _rpr_xml(self, bold) -> str:
+        """
+        Zwraca szablon formatowania fragmentu tekstu (w:rPr) dla bieżącej czcionki
+        
+        Args:
+            bold: True - pogrubienie, False - bez pogrubienia,
+                  None - bez ustawiania pogrubienia (separator)
+            
+        Returns:
+            Tekst XML elementu w:rPr (budowany raz dla czcionki, rozmiaru i pogrubienia)
+        """
+        key = (self.default_font, self.default_font_size, bold)
+        rpr = self._rpr_cache.get(key)
+        if rpr is None:
+            font = self.default_font
+            size = int(self.default_font_size.pt * 2)  # rozmiar w półpunktach
+            bold_xml = '' if bold is None else ('<w:b/>' if bold else '<w:b w:val="0"/>')
+            rpr = (
+                f'<w:rPr><w:rFonts w:ascii="{font}" w:hAnsi="{font}"/>'
+                f'{bold_xml}<w:sz w:val="{size}"/></w:rPr>'
+            )
+            self._rpr_cache[key] = rpr
+        return rpr
+    
+    def _run_xml(self, rpr: str, text: str) -> str:
+        """
+        Buduje XML fragmentu tekstu (w:r) z gotowym formatowaniem
+        
+        Args:
+            rpr: Szablon formatowania w:rPr
+            text: Tekst fragmentu
+            
+        Returns:
+            Tekst XML elementu w:r
+        """
+        # Tabulatory i znaki nowej linii jako w:tab / w:br (jak w python-docx)
+        if '\t' in text or '\r' in text or '\n' in text:
+            content = ''.join(
+                '<w:tab/>' if piece == '\t'
+                else '<w:br/>' if piece in ('\r', '\n')
+                else self._text_xml(piece)
+                for piece in _CONTROL_SPLIT_RE.split(text) if piece
+            )
+        else:
+            content = self._text_xml(text)
+        
+        return f'<w:r>{rpr}{content}</w:r>'
+    
+    def _text_xml(self, text: str) -> str:
+        """
+        Buduje XML elementu w:t (znaki specjalne XML zamienione na encje)
+        
+        Args:
+            text: Tekst elementu
+            
+        Returns:
+            Tekst XML elementu w:t
+        """
+        # Stały szablon z xml:space="preserve" - spacje na początku/końcu (np. "1. ")
+        # i wielokrotne spacje wewnątrz tekstu zostają zachowane, bez sprawdzania tekstu
+        return f'<w:t xml:space="preserve">{escape(text)}</w:t>'
+    
+    def _para_xml(self, rpr: str, text: str) -> str:
+        """
+        Buduje XML paragrafu z jednym fragmentem tekstu
+        
+        Args:
+            rpr: Szablon formatowania w:rPr
+            text: Tekst paragrafu
+            
+        Returns:
+            Tekst XML elementu w:p
+        """
+        return f'<w:p>{self._ppr_xml}{self._run_xml(rpr, text)}</w:p>'
+    
+    def _word_para_xml(self, number: str, english: str, pronunciation: str, polish: str) -> str:
         """
-        Formatuje paragraf z domyślnymi ustawieniami
+        Buduje XML paragrafu ze słówkiem
         
         Args:
-            paragraph: Paragraf do sformatowania
-            is_bold: Czy tekst ma być pogrubiony
+            number: Numer słówka
+            english: Słówko angielskie
+            pronunciation: Wymowa
+            polish: Tłumaczenie polskie
+            
+        Returns:
+            Tekst XML elementu w:p
         """
-        # Ustawienie czcionki i rozmiaru dla każdego fragmentu
-        for run in paragraph.runs:
-            run.font.name = self.default_font
-            run.font.size = self.default_font_size
-            run.bold = is_bold
-            # Ustawienie czcionki dla znaków wschodnioazjatyckich
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), self.default_font)
+        # Numer i kropka - BEZ pogrubienia
+        run_number = self._run_xml(self._rpr_xml(False), f"{number}. ")
         
-        # Ustawienie odstępu po paragrafie
-        paragraph.paragraph_format.space_after = self.spacing_after
+        # Słówko, wymowa i tłumaczenie - POGRUBIONE
+        run_word = self._run_xml(self._rpr_xml(True), f"{english} ({pronunciation}) – {polish}")
+        
+        return f'<w:p>{self._ppr_xml}{run_number}{run_word}</w:p>'
     
     def create_document(self, words_text: str, title: str = "Lista słówek") -> BytesIO:
         """
@@ -113,90 +221,57 @@ class WordGenerator:
         # Ustawienie dwóch kolumn
         self._set_two_columns(doc)
         
-        # Przetwarzanie tekstu słówek linia po linii
-        lines = words_text.strip().split('\n')
+        # Paragrafy dokumentu jako fragmenty tekstu XML (parsowane razem na końcu)
+        paragraphs = []
+        add_para = paragraphs.append
         
-        # Wzorzec do wyciągania słówek
-        # Format: numer. słówko (wymowa) – tłumaczenie
-        word_pattern = r'^(\d+)\.\s+(.+?)\s*\(([^)]+)\)\s*[–-]\s*(.+)$'
+        # Metoda używana w pętli zapisana w zmiennej lokalnej
+        match_word = _DOC_WORD_RE.match
         
-        for line in lines:
-            # Usuwanie białych znaków z początku i końca linii
-            line = line.strip()
-            
+        # Formatowanie fragmentów tekstu: separator (sama czcionka), zwykły, pogrubiony
+        rpr_font = self._rpr_xml(None)
+        rpr_plain = self._rpr_xml(False)
+        rpr_bold = self._rpr_xml(True)
+        
+        # Przetwarzanie tekstu słówek linia po linii (bez białych znaków na końcach)
+        for line in iter_lines(words_text):
             # Pomijanie pustych linii - dodajemy pusty paragraf
             if not line:
-                paragraph = doc.add_paragraph('')
-                paragraph.paragraph_format.space_after = Pt(0)
+                add_para(self._empty_para_xml)
                 continue
             
             # Sprawdzanie czy linia to separator (linia z myślnikami)
-            if re.match(r'^-+$', line):
+            if is_separator(line):
                 # Dodanie separatora jako tekst
-                paragraph = doc.add_paragraph()
-                run = paragraph.add_run(line)
-                run.font.name = self.default_font
-                run.font.size = self.default_font_size
-                paragraph.paragraph_format.space_after = self.spacing_after
+                add_para(self._para_xml(rpr_font, line))
                 continue
             
             # Sprawdzanie czy linia to nagłówek kategorii (same wielkie litery)
-            if line.isupper() and len(line) > 2:
+            if is_category(line):
                 # Dodanie nagłówka kategorii - pogrubiony
-                paragraph = doc.add_paragraph()
-                run = paragraph.add_run(line)
-                run.font.name = self.default_font
-                run.font.size = self.default_font_size
-                run.bold = True
-                paragraph.paragraph_format.space_after = self.spacing_after
+                add_para(self._para_xml(rpr_bold, line))
                 continue
             
             # Sprawdzanie czy to linia ze słówkiem
-            word_match = re.match(word_pattern, line)
+            word_match = match_word(line)
             if word_match:
-                # Tworzenie paragrafu ze słówkiem
-                paragraph = doc.add_paragraph()
-                
-                # Wyciąganie danych ze słówka
-                number = word_match.group(1)
-                english = word_match.group(2).strip()
-                pronunciation = word_match.group(3).strip()
-                polish = word_match.group(4).strip()
-                
-                # Numer i kropka - BEZ pogrubienia
-                run_number = paragraph.add_run(f"{number}. ")
-                run_number.font.name = self.default_font
-                run_number.font.size = self.default_font_size
-                run_number.bold = False
-                
-                # Słówko, wymowa i tłumaczenie - POGRUBIONE
-                run_word = paragraph.add_run(f"{english} ({pronunciation}) – {polish}")
-                run_word.font.name = self.default_font
-                run_word.font.size = self.default_font_size
-                run_word.bold = True
-                
-                # Ustawienie odstępu
-                paragraph.paragraph_format.space_after = self.spacing_after
-                continue
-            
-            # Sprawdzanie czy to linia z przykładem (ex: ...)
-            if line.lower().startswith('ex:'):
-                # Przykład - bez pogrubienia
-                paragraph = doc.add_paragraph()
-                run = paragraph.add_run(line)
-                run.font.name = self.default_font
-                run.font.size = self.default_font_size
-                run.bold = False
-                paragraph.paragraph_format.space_after = self.spacing_after
+                add_para(self._word_para_xml(
+                    word_match['number'],
+                    word_match['english'].strip(),
+                    word_match['pronunciation'].strip(),
+                    word_match['polish'].strip()
+                ))
                 continue
             
-            # Inna linia - bez pogrubienia
-            paragraph = doc.add_paragraph()
-            run = paragraph.add_run(line)
-            run.font.name = self.default_font
-            run.font.size = self.default_font_size
-            run.bold = False
-            paragraph.paragraph_format.space_after = self.spacing_after
+            # Inna linia (także przykład "ex: ...") - bez pogrubienia
+            add_para(self._para_xml(rpr_plain, line))
+        
+        # Jednorazowe parsowanie całej treści i wstawienie wszystkich paragrafów naraz
+        # przed ustawieniami sekcji (w:sectPr), które muszą pozostać na końcu treści
+        content = parse_xml(f'<w:body {nsdecls("w")}>{"".join(paragraphs)}</w:body>')
+        body = doc.element.body
+        index = body.index(body.find(qn('w:sectPr')))
+        body[index:index] = list(content)
         
         # Zapisanie dokumentu do bufora pamięci
         buffer = BytesIO()
@@ -217,62 +292,8 @@ class WordGenerator:
         Returns:
             Lista słowników z informacjami o słówkach
         """
-        # Lista na sparsowane słówka
-        words = []
-        
-        # Wzorzec do wyciągania słówek
-        # Format: numer. słówko (wymowa) – tłumaczenie
-        pattern = r'(\d+)\.\s+([a-zA-Z\s]+)\s*\(([^)]+)\)\s*[–-]\s*(.+)'
-        
-        # Wzorzec do wyciągania przykładów
-        example_pattern = r'ex:\s*(.+)'
-        
-        # Przetwarzanie tekstu linia po linii
-        lines = text.strip().split('\n')
-        current_word = None
-        current_category = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Pomijanie pustych linii i separatorów
-            if not line or re.match(r'^-+$', line):
-                continue
-            
-            # Sprawdzanie czy to kategoria
-            if line.isupper() and len(line) > 2:
-                current_category = line
-                continue
-            
-            # Próba dopasowania wzorca słówka
-            word_match = re.match(pattern, line)
-            if word_match:
-                # Jeśli było poprzednie słówko, dodaj je do listy
-                if current_word:
-                    words.append(current_word)
-                
-                # Tworzenie nowego słówka
-                current_word = {
-                    'number': int(word_match.group(1)),        # Numer słówka
-                    'english': word_match.group(2).strip(),    # Słówko angielskie
-                    'pronunciation': word_match.group(3).strip(),  # Wymowa
-                    'polish': word_match.group(4).strip(),     # Tłumaczenie polskie
-                    'example': None,                           # Przykład (do uzupełnienia)
-                    'category': current_category               # Kategoria
-                }
-                continue
-            
-            # Próba dopasowania przykładu
-            example_match = re.match(example_pattern, line, re.IGNORECASE)
-            if example_match and current_word:
-                # Dodanie przykładu do aktualnego słówka
-                current_word['example'] = example_match.group(1).strip()
-        
-        # Dodanie ostatniego słówka
-        if current_word:
-            words.append(current_word)
-        
-        return words
+        # Wspólny silnik parsowania (słówko angielskie: tylko litery i spacje)
+        return parse_lines(iter_lines(text), _TEXT_WORD_RE)
     
     def extract_word_list(self, text: str) -> list:
         """
@@ -285,8 +306,17 @@ class WordGenerator:
         Returns:
             Lista słówek angielskich (stringów)
         """
-        # Parsowanie pełnych słówek
-        words = self.parse_words_from_text(text)
+        # Tylko słówka angielskie - bez budowania pełnych słowników słówek
+        # (te same linie co w parse_words_from_text: nagłówki kategorii nie są słówkami)
+        result = []
+        match_word = _TEXT_WORD_RE.match
+        
+        for line in iter_lines(text):
+            if not line or is_category(line):
+                continue
+            
+            word_match = match_word(line)
+            if word_match:
+                result.append(word_match['english'].strip().lower())
         
-        # Wyciągnięcie samych słówek angielskich
-        return [word['english'].lower() for word in words]
+        return result
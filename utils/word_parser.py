@@ -6,6 +6,7 @@ Odczytuje dokumenty Word i wyciąga z nich listę słówek
 
 # Importowanie biblioteki do odczytu plików Word
 from docx import Document
+from docx.oxml.ns import qn
 
 # Importowanie wyrażeń regularnych
 import re
@@ -13,6 +14,220 @@ import re
 # Importowanie biblioteki do operacji na plikach
 from io import BytesIO
 
+# Grupowanie słówek według kategorii
+from collections import defaultdict
+
+
+# Wzorzec linii ze słówkiem: numer. słówko (wymowa) – tłumaczenie
+# (kompilowany raz przy imporcie modułu). Dopasowanie wykonuje silnik re w C - ręczny
+# skaner znaków w Pythonie o tej samej semantyce (z powrotami przy kilku nawiasach)
+# jest ok. 2-3 razy wolniejszy
+_WORD_RE = re.compile(
+    r'(?P<number>\d+)\.\s+(?P<english>.+?)\s*\((?P<pronunciation>[^)]+)\)\s*[–-]\s*(?P<polish>.+)'
+)
+
+# Przykład "ex:" zapisany w tej samej linii co tłumaczenie (bez względu na wielkość liter)
+_EX_INLINE_RE = re.compile(r'ex:', re.IGNORECASE)
+
+
+# Znaczniki XML treści dokumentu Word (odczyt paragrafów bez obiektów python-docx)
+_W_P = qn('w:p')
+_W_R = qn('w:r')
+_W_HYPERLINK = qn('w:hyperlink')
+_W_T = qn('w:t')
+_W_BR = qn('w:br')
+_W_TYPE = qn('w:type')
+
+# Elementy fragmentu tekstu (w:r) odpowiadające stałym znakom (jak w Paragraph.text)
+_RUN_CHARS = {
+    qn('w:tab'): '\t',
+    qn('w:ptab'): '\t',
+    qn('w:cr'): '\n',
+    qn('w:noBreakHyphen'): '-',
+}
+
+
+def _paragraph_text(paragraph) -> str:
+    """
+    Odczytuje tekst paragrafu bezpośrednio z XML (ten sam wynik co Paragraph.text)
+    
+    Args:
+        paragraph: Element w:p dokumentu
+        
+    Returns:
+        Tekst paragrafu (tabulatory jako "\t", złamania linii jako "\n")
+    """
+    parts = []
+    append = parts.append
+    
+    for child in paragraph:
+        # Fragmenty tekstu paragrafu - bezpośrednio lub wewnątrz hiperłącza
+        if child.tag == _W_R:
+            runs = (child,)
+        elif child.tag == _W_HYPERLINK:
+            runs = child.iterchildren(_W_R)
+        else:
+            continue
+        
+        for run in runs:
+            for element in run:
+                tag = element.tag
+                if tag == _W_T:
+                    append(element.text or '')
+                elif tag == _W_BR:
+                    # Złamanie linii - podział kolumny/strony nie daje tekstu
+                    if element.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                        append('\n')
+                else:
+                    char = _RUN_CHARS.get(tag)
+                    if char:
+                        append(char)
+    
+    return ''.join(parts)
+
+
+def iter_lines(text: str):
+    """
+    Zwraca kolejne linie tekstu bez białych znaków na początku i końcu
+    
+    Args:
+        text: Tekst z listą słówek
+        
+    Yields:
+        Linie tekstu (puste linie na początku i końcu tekstu są pomijane)
+    """
+    # Podział tylko po "\n" (nie splitlines) - inne znaki końca linii, np. "\r"
+    # lub "\u2028", zostają wewnątrz linii tak jak dotychczas
+    for line in text.strip().split('\n'):
+        yield line.strip()
+
+
+def is_separator(line: str) -> bool:
+    """
+    Sprawdza czy linia jest separatorem (złożona z samych myślników)
+    
+    Args:
+        line: Linia tekstu (bez białych znaków na końcach)
+        
+    Returns:
+        True jeśli linia jest niepusta i zawiera tylko znaki "-"
+    """
+    return bool(line) and not line.lstrip('-')
+
+
+def is_category(line: str) -> bool:
+    """
+    Sprawdza czy linia jest nagłówkiem kategorii (same wielkie litery, min. 3 znaki)
+    
+    Args:
+        line: Linia tekstu (bez białych znaków na końcach)
+        
+    Returns:
+        True jeśli linia jest nagłówkiem kategorii
+    """
+    # Szybkie odrzucenie krótkich linii i linii zaczynających się małą literą,
+    # przed sprawdzeniem całej linii przez isupper()
+    return len(line) > 2 and not line[0].islower() and line.isupper()
+
+
+def parse_lines(lines, word_re=_WORD_RE, split_inline_example: bool = False) -> list:
+    """
+    Parsuje kolejne linie listy słówek - wspólny silnik parserów tekstu i dokumentów
+    
+    Args:
+        lines: Linie (lub teksty paragrafów) bez białych znaków na końcach; paragraf
+               z "\n" może zawierać słówko w pierwszej linii i przykład w drugiej
+        word_re: Skompilowany wzorzec linii ze słówkiem
+                 (grupy: number, english, pronunciation, polish)
+        split_inline_example: Czy odcinać przykład "ex:" zapisany w tej samej linii
+                              co tłumaczenie
+        
+    Returns:
+        Lista słowników z informacjami o słówkach
+    """
+    # Lista na sparsowane słówka
+    words = []
+    
+    # Aktualna kategoria
+    current_category = None
+    
+    # Aktualne słówko (do którego dodajemy przykład)
+    current_word = None
+    
+    # Metody używane w pętli zapisane w zmiennych lokalnych
+    # (bez wyszukiwania atrybutów przy każdej linii)
+    match_word = word_re.match
+    add_word = words.append
+    
+    for text in lines:
+        # Pomijanie pustych linii i separatorów
+        if not text or is_separator(text):
+            continue
+        
+        # Sprawdzanie czy to kategoria (same wielkie litery)
+        if is_category(text):
+            current_category = text
+            continue
+        
+        word_match = None
+        example_text = None
+        
+        # Sprawdzanie czy słówko i przykład są w tej samej linii (oddzielone \n)
+        # Format: "1. word (wymowa) – tłumaczenie\nex: przykład"
+        if '\n' in text:
+            lines_in_para = text.split('\n')
+            # Pierwsza linia to słówko
+            word_match = match_word(lines_in_para[0].strip())
+            if word_match:
+                # Druga linia to przykład
+                example_line = lines_in_para[1].strip()
+                if example_line[:3].lower() == 'ex:':
+                    example_text = example_line[3:].strip()
+        
+        # Próba dopasowania wzorca słówka (bez przykładu w osobnej linii)
+        if word_match is None:
+            word_match = match_word(text)
+        
+        if word_match:
+            # Jeśli było poprzednie słówko, dodaj je do listy
+            if current_word:
+                add_word(current_word)
+            
+            # Wyciąganie tłumaczenia polskiego
+            polish = word_match['polish'].strip()
+            
+            # Jeśli w tłumaczeniu jest "ex:" to znaczy że przykład jest w tej samej linii
+            # Odcinamy go (podział na pierwszym "ex:", bez kopii tekstu małymi literami)
+            if split_inline_example:
+                parts = _EX_INLINE_RE.split(polish, maxsplit=1)
+                if len(parts) > 1:
+                    # Tłumaczenie to część przed "ex:", przykład to część po "ex:"
+                    polish = parts[0].strip()
+                    example_text = parts[1].strip()
+            
+            # Tworzenie nowego słówka
+            current_word = {
+                'number': int(word_match['number']),
+                'english': word_match['english'].strip(),
+                'pronunciation': word_match['pronunciation'].strip(),
+                'polish': polish,
+                'example': example_text,
+                'category': current_category
+            }
+            continue
+        
+        # Przykład - linia zaczynająca się od "ex:" (bez względu na wielkość liter)
+        if current_word and text[:3].lower() == 'ex:':
+            example_text = text[3:].strip()
+            if example_text:
+                current_word['example'] = example_text
+    
+    # Dodanie ostatniego słówka
+    if current_word:
+        add_word(current_word)
+    
+    return words
+
 
 class WordParser:
     """
@@ -42,103 +257,14 @@ class WordParser:
         # Wczytanie dokumentu Word
         doc = Document(file_data)
         
-        # Lista na sparsowane słówka
-        words = []
+        # Teksty paragrafów (elementy w:p treści dokumentu, bez tworzenia
+        # obiektów Paragraph i Run dla każdego z nich)
+        texts = (
+            _paragraph_text(para).strip()
+            for para in doc.element.body.iterchildren(_W_P)
+        )
         
-        # Aktualna kategoria
-        current_category = None
-        
-        # Aktualne słówko (do którego dodajemy przykład)
-        current_word = None
-        
-        # Wzorzec do wyciągania słówek
-        # Format: numer. słówko (wymowa) – tłumaczenie
-        word_pattern = r'(\d+)\.\s+(.+?)\s*\(([^)]+)\)\s*[–-]\s*(.+)'
-        
-        # Wzorzec do wyciągania przykładów
-        example_pattern = r'^ex:\s*(.+)$'
-        
-        # Przetwarzanie każdego paragrafu
-        for para in doc.paragraphs:
-            # Pobieranie tekstu paragrafu
-            text = para.text.strip()
-            
-            # Pomijanie pustych paragrafów i separatorów
-            if not text or re.match(r'^-+$', text):
-                continue
-            
-            # Sprawdzanie czy to kategoria (same wielkie litery)
-            if text.isupper() and len(text) > 2:
-                current_category = text
-                continue
-            
-            # Sprawdzanie czy słówko i przykład są w tej samej linii (oddzielone \n)
-            # Format: "1. word (wymowa) – tłumaczenie\nex: przykład"
-            if '\n' in text:
-                lines_in_para = text.split('\n')
-                # Pierwsza linia to słówko
-                word_line = lines_in_para[0].strip()
-                # Druga linia to przykład
-                example_line = lines_in_para[1].strip() if len(lines_in_para) > 1 else ''
-                
-                # Próba dopasowania wzorca słówka
-                word_match = re.match(word_pattern, word_line)
-                if word_match:
-                    # Jeśli było poprzednie słówko, dodaj je do listy
-                    if current_word:
-                        words.append(current_word)
-                    
-                    # Wyciągnięcie przykładu z drugiej linii
-                    example_text = None
-                    if example_line.lower().startswith('ex:'):
-                        example_text = example_line[3:].strip()
-                    
-                    # Tworzenie nowego słówka
-                    current_word = {
-                        'number': int(word_match.group(1)),
-                        'english': word_match.group(2).strip(),
-                        'pronunciation': word_match.group(3).strip(),
-                        'polish': word_match.group(4).strip(),
-                        'example': example_text,
-                        'category': current_category
-                    }
-                    continue
-            
-            # Próba dopasowania wzorca słówka (bez przykładu w tej samej linii)
-            word_match = re.match(word_pattern, text)
-            if word_match:
-                # Jeśli było poprzednie słówko, dodaj je do listy
-                if current_word:
-                    words.append(current_word)
-                
-                # Tworzenie nowego słówka
-                current_word = {
-                    'number': int(word_match.group(1)),
-                    'english': word_match.group(2).strip(),
-                    'pronunciation': word_match.group(3).strip(),
-                    'polish': word_match.group(4).strip(),
-                    'example': None,
-                    'category': current_category
-                }
-                continue
-            
-            # Próba dopasowania przykładu (case-insensitive)
-            example_match = re.match(example_pattern, text, re.IGNORECASE)
-            if example_match and current_word:
-                current_word['example'] = example_match.group(1).strip()
-                continue
-            
-            # Jeśli linia zaczyna się od "ex:" (bez względu na wielkość liter)
-            if text.lower().startswith('ex:') and current_word:
-                example_text = text[3:].strip()
-                if example_text:
-                    current_word['example'] = example_text
-        
-        # Dodanie ostatniego słówka
-        if current_word:
-            words.append(current_word)
-        
-        return words
+        return parse_lines(texts)
     
     def parse_text(self, text: str) -> list:
         """
@@ -150,101 +276,88 @@ class WordParser:
         Returns:
             Lista słowników z informacjami o słówkach
         """
-        # Lista na sparsowane słówka
-        words = []
-        
-        # Aktualna kategoria
-        current_category = None
-        
-        # Aktualne słówko
-        current_word = None
-        
-        # Wzorzec do wyciągania słówek
-        # Format: numer. słówko (wymowa) – tłumaczenie
-        # Używamy [^–-]+ zamiast .+ żeby nie wyciągać za dużo
-        word_pattern = r'(\d+)\.\s+(.+?)\s*\(([^)]+)\)\s*[–-]\s*(.+)'
-        
-        # Wzorzec do wyciągania przykładów
-        example_pattern = r'^ex:\s*(.+)$'
-        
-        # Przetwarzanie tekstu linia po linii
-        lines = text.strip().split('\n')
+        # Przykład może być zapisany w tej samej linii co tłumaczenie
+        return parse_lines(iter_lines(text), split_inline_example=True)
+    
+    def extract_word_list(self, words: list) -> list:
+        """
+        Wyciąga samą listę słówek angielskich
         
-        for line in lines:
-            # Usuwanie białych znaków
-            line = line.strip()
-            
-            # Pomijanie pustych linii i separatorów
-            if not line or re.match(r'^-+$', line):
-                continue
+        Args:
+            words: Lista słowników ze słówkami
             
-            # Sprawdzanie czy to kategoria
-            if line.isupper() and len(line) > 2:
-                current_category = line
-                continue
+        Returns:
+            Lista słówek angielskich (stringów)
+        """
+        return [word['english'].lower() for word in words if word.get('english')]
+    
+    def clean_words(self, words: list) -> list:
+        """
+        Porządkuje pola słówek z odpowiedzi JSON modelu przed zapisem w formacie tekstowym
+        (znak nowej linii w polu rozbiłby linię słówka, a nawias w wymowie - jej wzorzec)
+        
+        Args:
+            words: Lista słowników ze słówkami (z odpowiedzi JSON)
             
-            # Próba dopasowania wzorca słówka
-            word_match = re.match(word_pattern, line)
-            if word_match:
-                # Jeśli było poprzednie słówko, dodaj je do listy
-                if current_word:
-                    words.append(current_word)
-                
-                # Wyciąganie tłumaczenia polskiego
-                polish_text = word_match.group(4).strip()
-                
-                # Jeśli w tłumaczeniu jest "ex:" to znaczy że przykład jest w tej samej linii
-                # Odcinamy go
-                if 'ex:' in polish_text.lower():
-                    # Znajdujemy pozycję "ex:" (case-insensitive)
-                    ex_pos = polish_text.lower().find('ex:')
-                    # Tłumaczenie to część przed "ex:"
-                    actual_polish = polish_text[:ex_pos].strip()
-                    # Przykład to część po "ex:"
-                    example_text = polish_text[ex_pos+3:].strip()
-                else:
-                    actual_polish = polish_text
-                    example_text = None
-                
-                # Tworzenie nowego słówka
-                current_word = {
-                    'number': int(word_match.group(1)),
-                    'english': word_match.group(2).strip(),
-                    'pronunciation': word_match.group(3).strip(),
-                    'polish': actual_polish,
-                    'example': example_text,
-                    'category': current_category
-                }
-                
-                continue
+        Returns:
+            Lista słowników ze słówkami - pola tekstowe w jednej linii
+        """
+        cleaned = []
+        for word in words:
+            # Białe znaki (także nowe linie i tabulatory) zamieniane na pojedyncze spacje
+            english, pronunciation, polish, example, category = (
+                " ".join(str(word.get(key) or '').split())
+                for key in ('english', 'pronunciation', 'polish', 'example', 'category')
+            )
             
-            # Próba dopasowania przykładu
-            example_match = re.match(example_pattern, line, re.IGNORECASE)
-            if example_match and current_word:
-                current_word['example'] = example_match.group(1).strip()
-                continue
+            # Przykład bez przedrostka "ex:" (dodawany przy formatowaniu)
+            if example[:3].lower() == 'ex:':
+                example = example[3:].strip()
             
-            # Jeśli linia zaczyna się od "ex:"
-            if line.lower().startswith('ex:') and current_word:
-                current_word['example'] = line[3:].strip()
+            cleaned.append({
+                'number': int(word['number']),
+                'english': english,
+                'pronunciation': pronunciation.replace('(', '').replace(')', '').strip(),
+                'polish': polish,
+                'example': example or None,      # Pusty przykład zapisujemy jako brak przykładu
+                'category': category.upper() or None
+            })
         
-        # Dodanie ostatniego słówka
-        if current_word:
-            words.append(current_word)
-        
-        return words
+        return cleaned
     
-    def extract_word_list(self, words: list) -> list:
+    def format_words_as_text(self, words: list) -> str:
         """
-        Wyciąga samą listę słówek angielskich
+        Zamienia listę słówek na tekst w formacie listy słówek
+        (ten sam format, który odczytuje parse_text i WordGenerator)
         
         Args:
             words: Lista słowników ze słówkami
             
         Returns:
-            Lista słówek angielskich (stringów)
+            Tekst: kategorie, "numer. słówko (wymowa) – tłumaczenie", "ex: przykład"
         """
-        return [word['english'].lower() for word in words if word.get('english')]
+        result = []
+        current_category = None
+        
+        for word in words:
+            # Nagłówek kategorii (oddzielony separatorem od poprzedniej)
+            category = word.get('category')
+            if category and category != current_category:
+                if result:
+                    result.append('-' * 85)
+                result.append(category.upper())
+                result.append('')
+                current_category = category
+            
+            # Format: numer. słówko (wymowa) – tłumaczenie
+            result.append(f"{word['number']}. {word['english']} ({word['pronunciation']}) – {word['polish']}")
+            
+            # Dodanie przykładu jeśli istnieje
+            if word.get('example'):
+                result.append(f"ex: {word['example']}")
+            result.append('')
+        
+        return "\n".join(result).strip()
     
     def format_words_for_display(self, words: list) -> str:
         """
@@ -256,28 +369,26 @@ class WordParser:
         Returns:
             Sformatowany tekst do wyświetlenia
         """
-        # Grupowanie słówek według kategorii
-        categories = {}
+        # Grupowanie słówek według kategorii (w kolejności pierwszego wystąpienia)
+        categories = defaultdict(list)
         for word in words:
-            category = word.get('category', 'INNE')
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(word)
+            categories[word.get('category', 'INNE')].append(word)
         
-        # Formatowanie tekstu
+        # Formatowanie tekstu - wszystkie linie w jednej liście, łączone na końcu
         result = []
+        append = result.append
         
         for category, cat_words in categories.items():
             if category:
-                result.append(f"\n**{category}**\n")
+                append(f"\n**{category}**\n")
             
             for word in cat_words:
                 # Format: numer. słówko (wymowa) – tłumaczenie
-                line = f"{word['number']}. **{word['english']}** ({word['pronunciation']}) – {word['polish']}"
-                result.append(line)
+                append(f"{word['number']}. **{word['english']}** ({word['pronunciation']}) – {word['polish']}")
                 
                 # Dodanie przykładu jeśli istnieje
-                if word.get('example'):
-                    result.append(f"   *ex: {word['example']}*")
+                example = word.get('example')
+                if example:
+                    append(f"   *ex: {example}*")
         
         return "\n".join(result)